@@ -0,0 +1,291 @@
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+from math import ceil, gcd, inf
+from task_systems import PeriodicTaskSystem
+
+"""
+This module decides online whether tasks can be added to a task system without any deadline misses.
+
+Each admission controller keeps incremental analysis state, so admitting a task only analyzes how that task changes
+the state instead of re-analyzing (or re-simulating) the entire task system. Tasks are treated as sporadic (i.e.
+phases are ignored), which is a sufficient test for periodic tasks, and processors are ideal (no overhead).
+"""
+
+
+class _RangeMinTree:
+    """Array supporting range additions and range minimum queries in logarithmic time"""
+
+    def __init__(self, values):
+        self.length = len(values)
+        self.size = 1
+        while self.size < len(values):
+            self.size *= 2
+        self.height = self.size.bit_length() - 1
+        self.minimum = [inf] * (2 * self.size)  # minimum of each subtree, including its pending addition
+        self.pending = [0] * self.size  # addition not yet applied to the children of each inner node
+        self.minimum[self.size:self.size + len(values)] = values
+        for node in range(self.size - 1, 0, -1):
+            self.minimum[node] = min(self.minimum[2 * node], self.minimum[2 * node + 1])
+
+    def _apply(self, node, value):
+        self.minimum[node] += value
+        if node < self.size:
+            self.pending[node] += value
+
+    def _pull(self, node):
+        while node > 1:
+            node //= 2
+            self.minimum[node] = min(self.minimum[2 * node], self.minimum[2 * node + 1]) + self.pending[node]
+
+    def _push(self, node):
+        for shift in range(self.height, 0, -1):
+            ancestor = node >> shift
+            if self.pending[ancestor] != 0:
+                self._apply(2 * ancestor, self.pending[ancestor])
+                self._apply(2 * ancestor + 1, self.pending[ancestor])
+                self.pending[ancestor] = 0
+
+    def add(self, start, end, value):
+        """Add value to the entries with indices in [start, end)"""
+        left, right = start + self.size, end + self.size
+        while left < right:
+            if left % 2 == 1:
+                self._apply(left, value)
+                left += 1
+            if right % 2 == 1:
+                right -= 1
+                self._apply(right, value)
+            left //= 2
+            right //= 2
+        self._pull(start + self.size)
+        self._pull(end - 1 + self.size)
+
+    def min(self, start, end):
+        """Returns the minimum of the entries with indices in [start, end)"""
+        left, right = start + self.size, end + self.size
+        self._push(left)
+        self._push(right - 1)
+        minimum = inf
+        while left < right:
+            if left % 2 == 1:
+                minimum = min(minimum, self.minimum[left])
+                left += 1
+            if right % 2 == 1:
+                right -= 1
+                minimum = min(minimum, self.minimum[right])
+            left //= 2
+            right //= 2
+        return minimum
+
+
+def _demand_steps(task, end):
+    """Returns the times in [0, :end:) at which the demand bound function of a task increases by its cost"""
+    if task.period == inf:
+        return range(task.relative_deadline, end, end)[:1]
+    return range(task.relative_deadline, end, task.period)
+
+
+class EDFAdmissionController:
+    """Exact admission control for uniprocessor EDF by processor demand analysis"""
+
+    def __init__(self, task_system=None, max_bound=10 ** 7):
+        """
+        :param task_system: optional task system of already admitted tasks, which must be schedulable
+        :param max_bound: longest interval the demand of the task system may be checked over. Raises a ValueError
+                          if a longer interval is needed, since its analysis state would not fit in memory
+        """
+        self.task_system = PeriodicTaskSystem()
+        self.utilization = Fraction(0)  # exact utilization
+        # sum of (T_i - D_i) * U_i over periodic tasks and C_i over one-shot tasks, which bounds the interval to check
+        self.excess = Fraction(0)
+        self.max_relative_deadline = 0
+        self.max_bound = max_bound
+        self.constrained = False  # whether any admitted task has a relative deadline less than its period
+        self.slack = None  # t - (demand by t) for every time t, built once demand must be checked
+
+        if task_system is not None:
+            for task in task_system:
+                if not self.admit(task):
+                    raise ValueError(f"{task} cannot be admitted to the task system!")
+
+    def _bound(self, utilization, excess, max_relative_deadline, hyperperiod):
+        """Returns the time by which a demand overload must first occur (if at all)"""
+        bound = hyperperiod + max_relative_deadline
+        if utilization < 1:
+            bound = min(bound, max(max_relative_deadline, ceil(excess / (1 - utilization))))
+        return bound
+
+    def _build_slack(self, bound):
+        """Build the slack of the admitted tasks at every time up to at least :bound:"""
+        if bound > self.max_bound:
+            raise ValueError(f"Demand must be checked until {bound}, which exceeds {self.max_bound}!")
+
+        size = max(bound + 1, 2 * self.slack.length if self.slack is not None else 0)
+        demand_increases = [0] * size
+        for task in self.task_system:
+            for t in _demand_steps(task, size):
+                demand_increases[t] += task.cost
+
+        slack = []
+        demand = 0
+        for t in range(size):
+            demand += demand_increases[t]
+            slack.append(t - demand)
+        self.slack = _RangeMinTree(slack)
+
+    def _analyze(self, task):
+        """Returns the updated aggregates if the task can be admitted or None otherwise"""
+        utilization = self.utilization
+        excess = self.excess
+        hyperperiod = self.task_system.hyperperiod
+        if task.period != inf:
+            utilization += Fraction(task.cost) / Fraction(task.period)
+            excess += (Fraction(task.period) - Fraction(task.relative_deadline)) * Fraction(task.cost) / \
+                Fraction(task.period)
+            hyperperiod = task.period if hyperperiod == 0 else \
+                hyperperiod // gcd(hyperperiod, task.period) * task.period
+        else:
+            excess += Fraction(task.cost)  # the demand of a one-shot task does not grow with t
+        if utilization > 1:
+            return None
+
+        max_relative_deadline = max(self.max_relative_deadline, task.relative_deadline)
+        constrained = self.constrained or task.relative_deadline < task.period
+        if not constrained:
+            # demand by any time t is at most utilization * t
+            return utilization, excess, max_relative_deadline, constrained
+
+        bound = self._bound(utilization, excess, max_relative_deadline, hyperperiod)
+        if self.slack is None or self.slack.length <= bound:
+            self._build_slack(bound)
+
+        # the task's demand is constant between its deadlines, so compare it to the least slack in between
+        demand = 0
+        steps = list(_demand_steps(task, bound + 1))
+        for step_idx, t in enumerate(steps):
+            demand += task.cost
+            next_t = steps[step_idx + 1] if step_idx + 1 < len(steps) else bound + 1
+            if self.slack.min(t, next_t) < demand:
+                return None
+
+        return utilization, excess, max_relative_deadline, constrained
+
+    def can_admit(self, task):
+        """Returns whether a task can be added without any deadline misses"""
+        return self._analyze(task) is not None
+
+    def admit(self, task):
+        """Add a task if it can be added without any deadline misses. Returns whether the task was added"""
+        state = self._analyze(task)
+        if state is None:
+            return False
+
+        self.utilization, self.excess, self.max_relative_deadline, self.constrained = state
+        self.task_system.add_tasks([task])
+        if self.slack is not None:
+            for t in _demand_steps(task, self.slack.length):
+                self.slack.add(t, self.slack.length, -task.cost)
+        return True
+
+
+def rate_monotonic(task):
+    """Rate-Monotonic priority of a task (smaller is higher priority)"""
+    return task.period
+
+
+def deadline_monotonic(task):
+    """Deadline-Monotonic priority of a task (smaller is higher priority)"""
+    return task.relative_deadline
+
+
+class FixedPriorityAdmissionController:
+    """Admission control for uniprocessor fixed-priority scheduling by response-time analysis"""
+
+    def __init__(self, priority=rate_monotonic, task_system=None):
+        """
+        :param priority: function from a task to its priority (smaller is higher priority). Tasks with equal
+                         priority are conservatively assumed to interfere with each other
+        :param task_system: optional task system of already admitted tasks, which must be schedulable
+        """
+        self.priority = priority
+        self.task_system = PeriodicTaskSystem()
+        self.tasks = []  # admitted tasks in order of priority
+        self.priorities = []  # priorities of self.tasks
+        self.response_times = {}  # task -> worst-case response time
+        self.interference = {}  # task -> {period: total cost of interfering tasks with that period}
+
+        if task_system is not None:
+            for task in task_system:
+                if not self.admit(task):
+                    raise ValueError(f"{task} cannot be admitted to the task system!")
+
+    @staticmethod
+    def _response_time(task, interference, response_time):
+        """
+        Iterate the response time of a task to its fixed point, starting from a lower bound on it.
+
+        :param interference: dictionary from period to the total cost of interfering tasks with that period
+        :return: the response time or None if it exceeds the task's relative deadline
+        """
+        while True:
+            # one-shot tasks (infinite period) interfere once
+            new_response_time = task.cost + sum(cost if period == inf else ceil(response_time / period) * cost
+                                                for period, cost in interference.items())
+            if new_response_time > task.relative_deadline:
+                return None
+            if new_response_time == response_time:
+                return response_time
+            response_time = new_response_time
+
+    def _analyze(self, task):
+        """Returns the updated response times if the task can be admitted or None otherwise"""
+        if task.relative_deadline > task.period:
+            raise ValueError("Response-time analysis requires relative deadlines not exceeding periods!")
+
+        priority = self.priority(task)
+        num_higher_or_equal = bisect_right(self.priorities, priority)
+        interference = {}
+        for interfering_task in self.tasks[:num_higher_or_equal]:
+            interference[interfering_task.period] = interference.get(interfering_task.period, 0) + \
+                interfering_task.cost
+        response_time = self._response_time(task, interference, task.cost)
+        if response_time is None:
+            return None
+        response_time_updates = {task: response_time}
+
+        # interference only increases the response times of tasks with lower or equal priority, so their previous
+        # response times are lower bounds to iterate from
+        for admitted_task in self.tasks[bisect_left(self.priorities, priority):]:
+            admitted_interference = self.interference[admitted_task]
+            admitted_interference[task.period] = admitted_interference.get(task.period, 0) + task.cost
+            response_time = self._response_time(admitted_task, admitted_interference,
+                                                self.response_times[admitted_task])
+            admitted_interference[task.period] -= task.cost  # only analyzing, not admitting yet
+            if admitted_interference[task.period] == 0:
+                del admitted_interference[task.period]
+            if response_time is None:
+                return None
+            response_time_updates[admitted_task] = response_time
+
+        return num_higher_or_equal, priority, interference, response_time_updates
+
+    def can_admit(self, task):
+        """Returns whether a task can be added without any deadline misses"""
+        return self._analyze(task) is not None
+
+    def admit(self, task):
+        """Add a task if it can be added without any deadline misses. Returns whether the task was added"""
+        state = self._analyze(task)
+        if state is None:
+            return False
+
+        idx, priority, interference, response_time_updates = state
+        for admitted_task in self.tasks[bisect_left(self.priorities, priority):]:
+            self.interference[admitted_task][task.period] = \
+                self.interference[admitted_task].get(task.period, 0) + task.cost
+        self.tasks.insert(idx, task)
+        self.priorities.insert(idx, priority)
+        self.interference[task] = interference
+        self.response_times.update(response_time_updates)
+        self.task_system.add_tasks([task])
+        return True
@@ -0,0 +1,57 @@
+from statistics import median
+import subprocess
+import sys
+
+"""
+This script measures how long a fresh interpreter takes to import each module, which short-lived experiment worker
+processes pay before simulating anything. It also reports whether the import pulled in matplotlib or numpy, which
+only plotting should need.
+
+Run from the repository root: python benchmarks/import_time.py [repetitions]
+"""
+
+MODULES = [
+    "task_systems",
+    "priority_functions",
+    "task_scheduling",
+    "task_generation",
+    "schedule_sinks",
+    "schedule_plotting",
+    "variant_evaluation",
+    "breakdown_utilization_experiments.breakdown_density",
+    "breakdown_utilization_experiments.work_queue",
+]
+
+# prints the import time in seconds and which heavy dependencies were loaded
+_MEASURE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+end = time.perf_counter()
+print(end - start, " ".join(name for name in ("matplotlib", "numpy") if name in sys.modules))
+"""
+
+
+def import_time(module, repetitions=5):
+    """
+    Measure the time to import a module in fresh interpreters.
+
+    :param module: name of module to import
+    :param repetitions: number of interpreters to start
+    :return: median import time in seconds and list of heavy dependencies that were imported
+    """
+    times = []
+    heavy_dependencies = []
+    for _ in range(repetitions):
+        output = subprocess.run([sys.executable, "-c", _MEASURE.format(module=module)], check=True,
+                                capture_output=True, text=True).stdout.split()
+        times.append(float(output[0]))
+        heavy_dependencies = output[1:]
+    return median(times), heavy_dependencies
+
+
+if __name__ == "__main__":
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for module in MODULES:
+        seconds, heavy_dependencies = import_time(module, repetitions)
+        print(f"{module:55} {1000 * seconds:8.1f} ms  {' '.join(heavy_dependencies)}")
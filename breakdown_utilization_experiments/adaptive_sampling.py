@@ -0,0 +1,153 @@
+from breakdown_utilization_experiments.work_queue import breakdown_density_task
+from math import inf, sqrt
+from multiprocessing import get_context
+from statistics import NormalDist
+
+"""
+This module averages breakdown densities over random task systems with adaptive sample sizes per sweep point.
+
+Instead of simulating a fixed number of task systems per point, each point keeps a streaming mean and confidence
+interval. A point stops being sampled once its confidence interval is narrow enough, and every round of samples goes to
+the points whose intervals are widest relative to the target. Points use the same sequence of task system seeds, so
+their means remain comparable along the sweep.
+"""
+
+
+class RunningStatistics:
+    """Streaming mean and variance of samples by Welford's algorithm"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_squared_deviations = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_squared_deviations += delta * (value - self.mean)
+
+    def variance(self):
+        """Returns the sample variance (inf with fewer than two samples)"""
+        if self.count < 2:
+            return inf
+        return self.sum_squared_deviations / (self.count - 1)
+
+    def half_width(self, confidence=0.95):
+        """Returns the half width of the normal-approximation confidence interval of the mean"""
+        if self.count < 2:
+            return inf
+        return NormalDist().inv_cdf((1 + confidence) / 2) * sqrt(self.variance() / self.count)
+
+    def __str__(self):
+        return f"{self.mean} +- {self.half_width()} ({self.count} samples)"
+
+
+def breakdown_density_sampler(parameter_name, num_tasks, num_processors=1, warm_cache_rate=50):
+    """
+    Returns a function computing the breakdown density of a sweep point for a task system seed.
+
+    Sweep points are (scheduler, parameter) pairs, where the scheduler is a key of work_queue.SCHEDULERS and the
+    parameter is the value of the swept processor parameter :parameter_name:.
+    """
+
+    def sample(point, seed):
+        scheduler, parameter = point
+        return breakdown_density_task({
+            "seed": seed, "scheduler": scheduler, "parameter_name": parameter_name, "parameter": parameter,
+            "num_tasks": num_tasks, "num_processors": num_processors, "warm_cache_rate": warm_cache_rate
+        })
+
+    return sample
+
+
+# Sampling function of the current sweep, inherited by forked workers
+_shared_sample = None
+
+
+def _set_shared_sample(sample):
+    global _shared_sample
+    _shared_sample = sample
+
+
+def _shared_sample_point(point_and_seed):
+    return _shared_sample(*point_and_seed)
+
+
+def adaptive_sweep(points, sample, target_half_width, confidence=0.95, min_samples=5, max_samples=1000,
+                   max_total_samples=None, processes=None):
+    """
+    Estimate the mean of a sampled quantity at each sweep point to a target precision.
+
+    :param points: sweep points (e.g. (scheduler, parameter) pairs)
+    :param sample: function of a point and a task system seed returning one sample (e.g. breakdown_density_sampler)
+    :param target_half_width: a point converges once the half width of its confidence interval is at most this
+    :param confidence: confidence level of the intervals
+    :param min_samples: number of samples per point before its interval is trusted
+    :param max_samples: maximum number of samples per point
+    :param max_total_samples: optional maximum number of samples over all points
+    :param processes: number of forked worker processes, which each take one sample per round from the noisiest
+                      points. Defaults to sampling sequentially, one sample per round
+    :return: dictionary from each point to its RunningStatistics
+    """
+    statistics = {point: RunningStatistics() for point in points}
+    batch_size = 1 if processes is None else processes
+    total_samples = 0
+
+    def remaining(point):
+        point_statistics = statistics[point]
+        return point_statistics.count < max_samples and \
+            (point_statistics.count < min_samples or point_statistics.half_width(confidence) > target_half_width)
+
+    def noise(point):
+        """Points are ranked by how far they are from converging, starting with points below min_samples"""
+        point_statistics = statistics[point]
+        if point_statistics.count < min_samples:
+            return inf, -point_statistics.count
+        return point_statistics.half_width(confidence) / target_half_width, 0
+
+    pool = None if processes is None or processes <= 1 else \
+        get_context("fork").Pool(processes, initializer=_set_shared_sample, initargs=(sample,))
+    try:
+        while max_total_samples is None or total_samples < max_total_samples:
+            unconverged = sorted((point for point in statistics if remaining(point)), key=noise, reverse=True)
+            if len(unconverged) == 0:
+                break
+
+            if max_total_samples is not None:
+                batch_size = min(batch_size, max_total_samples - total_samples)
+
+            # cycle through the noisiest points, so that workers stay busy when only a few points are left. Every
+            # point samples the same sequence of seeds
+            next_seeds = {point: statistics[point].count for point in unconverged}
+            batch = []
+            point_seeds = []
+            while len(batch) < batch_size and len(next_seeds) > 0:
+                for point in list(next_seeds):
+                    if len(batch) == batch_size:
+                        break
+                    batch.append(point)
+                    point_seeds.append((point, next_seeds[point]))
+                    next_seeds[point] += 1
+                    if next_seeds[point] == max_samples:
+                        del next_seeds[point]
+
+            if pool is None:
+                samples = [sample(point, seed) for point, seed in point_seeds]
+            else:
+                samples = pool.map(_shared_sample_point, point_seeds)
+
+            for point, value in zip(batch, samples):
+                statistics[point].add(value)
+            total_samples += len(batch)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return statistics
+
+
+def sweep_means(statistics):
+    """Returns a dictionary from each point to its mean, in the format of one sweep of work_queue.merge_results"""
+    return {point: point_statistics.mean for point, point_statistics in statistics.items()}
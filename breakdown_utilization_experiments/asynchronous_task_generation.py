@@ -1,16 +1,5 @@
-import functools
-from cProfile import run
-from math import floor, inf
-import pickle
 from random import choice, randint
-import matplotlib.pyplot as plt
-from multiprocessing import cpu_count, Pool
-from priority_functions import *
-from schedule_plotting import *
-from task_scheduling import *
-from task_systems import *
-from time import time
-import sys
+from task_systems import PeriodicTask, PeriodicTaskSystem
 
 # discrete time model with 1 time unit = 1 microsecond
 MS = 1000
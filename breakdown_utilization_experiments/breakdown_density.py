@@ -1,16 +1,10 @@
 import functools
-from cProfile import run
-from math import floor, inf
-import pickle
-from random import choice, randint
-import matplotlib.pyplot as plt
-from multiprocessing import cpu_count, Pool
-from priority_functions import *
-from schedule_plotting import *
-from task_scheduling import *
-from task_systems import *
-from time import time
+from math import ceil, floor, inf
+from multiprocessing import cpu_count, current_process, get_context
+from multiprocessing.pool import ThreadPool
 import sys
+from task_scheduling import MultiprocessorScheduler, Processor, UniprocessorScheduler
+from task_systems import PeriodicTask, PeriodicTaskSystem
 
 
 def reweight_task_system(w, task_system):
@@ -19,7 +13,8 @@ def reweight_task_system(w, task_system):
                                for task in task_system])
 
 
-def uniprocessor_breakdown_density(scheduler, task_system, density_tolerance=1e-3, warm_cache_rate=50):
+def uniprocessor_breakdown_density(scheduler, task_system, density_tolerance=1e-3, warm_cache_rate=50,
+                                   coarsening=None):
     @functools.lru_cache(maxsize=10)
     def test_weight(weight):
         reweighted_task_system = reweight_task_system(weight, task_system)
@@ -28,6 +23,9 @@ def uniprocessor_breakdown_density(scheduler, task_system, density_tolerance=1e-
 
     weight = warm_cache_rate * (1 + len(task_system) / min(task.period for task in task_system)) \
              / task_system.utilization()
+    if coarsening is not None:
+        return multifidelity_breakdown_density(scheduler, task_system, weight, coarsening, density_tolerance)
+
     weight_step = weight
 
     last_schedulable = False
@@ -48,7 +46,242 @@ def uniprocessor_breakdown_density(scheduler, task_system, density_tolerance=1e-
             weight += weight_step
 
 
-def multiprocessor_breakdown_density(scheduler, task_system, utilization_tolerance=1e-3, warm_cache_rate=50):
+# Scheduler and task system of the current speculative search, inherited by forked workers
+_shared_search = None
+
+
+def _set_shared_search(scheduler, task_system):
+    global _shared_search
+    _shared_search = (scheduler, task_system)
+
+
+def _test_weight(scheduler, task_system, weight):
+    _, schedulable = scheduler.generate_schedule(reweight_task_system(weight, task_system))
+    return schedulable
+
+
+def _test_shared_weight(weight):
+    return _test_weight(*_shared_search, weight)
+
+
+def _free_threaded():
+    """Returns whether threads of this interpreter run in parallel (free-threaded CPython 3.13+ without the GIL)"""
+    return hasattr(sys, "_is_gil_enabled") and not sys._is_gil_enabled()
+
+
+def speculative_breakdown_density(scheduler, task_system, weight, density_tolerance=1e-3, num_candidates=None,
+                                  executor=None):
+    """
+    Find the breakdown density by testing :num_candidates: weights at once in forked worker processes.
+
+    Each round splits the bracket between the largest weight known to be schedulable and the smallest weight known to
+    be unschedulable into num_candidates + 1 equal parts and narrows it to the part containing the breakdown point.
+    Without the GIL, candidates are tested by threads sharing the (reentrant) scheduler instead of forked processes.
+    Worker processes of other pools (e.g. experiment sweeps) are daemons, which cannot fork workers of their own, so
+    they bisect (one candidate per round) unless an executor is provided.
+
+    :param scheduler: scheduler to test schedulability with
+    :param task_system: task system to reweight
+    :param weight: initial weight, which is doubled until the reweighted task system is unschedulable
+    :param density_tolerance: returns once the densities at either end of the bracket differ by less than this
+    :param num_candidates: number of weights tested per round. Defaults to the number of CPUs
+    :param executor: optional pool or executor with a map method (e.g. a multiprocessing Pool, ThreadPool or
+                     concurrent.futures executor) to test candidates with, which is reused across searches. Process
+                     pools require a picklable scheduler
+    :return: density of the largest schedulable weight found
+    """
+    if num_candidates is None:
+        num_candidates = cpu_count()
+
+    def density(w):
+        return reweight_task_system(w, task_system).density()
+
+    pool = None
+    if executor is not None:
+        test_weight = functools.partial(_test_weight, scheduler, task_system)
+
+        def test_weights(candidates):
+            return list(executor.map(test_weight, candidates))
+    elif current_process().daemon:
+        num_candidates = 1  # testing candidates one after another only pays off as bisection
+
+        def test_weights(candidates):
+            return [_test_weight(scheduler, task_system, candidate) for candidate in candidates]
+    else:
+        if _free_threaded():
+            pool = ThreadPool(num_candidates)
+            test_weight = functools.partial(_test_weight, scheduler, task_system)
+        else:
+            pool = get_context("fork").Pool(num_candidates, initializer=_set_shared_search,
+                                            initargs=(scheduler, task_system))
+            test_weight = _test_shared_weight
+
+        def test_weights(candidates):
+            return pool.map(test_weight, candidates)
+
+    try:
+        schedulable_weight = 0
+        unschedulable_weight = weight
+        while test_weights([unschedulable_weight])[0]:
+            schedulable_weight = unschedulable_weight
+            unschedulable_weight *= 2
+
+        schedulable_weight, _ = _narrow_bracket(test_weights, density, schedulable_weight, unschedulable_weight,
+                                                density_tolerance, num_candidates)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    return density(schedulable_weight)
+
+
+def _narrow_bracket(test_weights, density, schedulable_weight, unschedulable_weight, density_tolerance,
+                    num_candidates):
+    """
+    Narrow a bracket around the breakdown weight until the densities at either end differ by less than the tolerance.
+
+    :param test_weights: function returning whether each weight in a list is schedulable
+    :param density: function returning the density of the task system reweighted by a weight
+    :return: narrowed (schedulable weight, unschedulable weight) bracket
+    """
+    while density(unschedulable_weight) - density(schedulable_weight) >= density_tolerance and \
+            unschedulable_weight - schedulable_weight > 1e-12 * unschedulable_weight:
+        step = (unschedulable_weight - schedulable_weight) / (num_candidates + 1)
+        candidates = [schedulable_weight + k * step for k in range(1, num_candidates + 1)]
+        results = test_weights(candidates)
+
+        # narrow to the part ending at the first unschedulable candidate
+        for candidate, schedulable in zip(candidates, results):
+            if not schedulable:
+                unschedulable_weight = candidate
+                break
+            schedulable_weight = candidate
+
+    return schedulable_weight, unschedulable_weight
+
+
+def coarsen_task_system(task_system, coarsening, pessimistic):
+    """
+    Scale a task system's time down by a factor, rounding conservatively.
+
+    :param task_system: task system to coarsen
+    :param coarsening: number of time units per coarse time unit
+    :param pessimistic: whether to round costs up and periods and relative deadlines down (so that the coarse task
+                        system is at least as hard to schedule) or the other way around (at most as hard)
+    :return: coarsened task system
+    """
+    if any(task.relative_deadline < coarsening or task.period < coarsening for task in task_system):
+        raise ValueError(f"Coarsening by {coarsening} would round periods or relative deadlines down to zero!")
+
+    round_cost, round_time = (ceil, floor) if pessimistic else (floor, ceil)
+    return PeriodicTaskSystem([PeriodicTask(phase=floor(task.phase / coarsening),
+                                            period=task.period if task.period == inf else
+                                            round_time(task.period / coarsening),
+                                            cost=max(1, round_cost(task.cost / coarsening)),
+                                            relative_deadline=round_time(task.relative_deadline / coarsening),
+                                            id=task.id)
+                               for task in task_system])
+
+
+def coarsen_scheduler(scheduler, coarsening, pessimistic):
+    """
+    Returns a scheduler with the same priority function on processors whose overheads and cache warmup are scaled to
+    coarse time units, rounding up if :pessimistic: and down otherwise (see coarsen_task_system).
+    """
+    round_cost, round_time = (ceil, floor) if pessimistic else (floor, ceil)
+
+    def coarsen_processor(CPU):
+        return Processor(schedule_cost=round_cost(CPU.schedule_cost / coarsening),
+                         dispatch_cost=round_cost(CPU.dispatch_cost / coarsening),
+                         preemption_cost=round_cost(CPU.preemption_cost / coarsening),
+                         cache_warmup_time=None if CPU.cache_warmup_time is None else
+                         max(1, round_cost(CPU.cache_warmup_time / coarsening)),
+                         warm_cache_rate=CPU.warm_cache_rate)
+
+    if isinstance(scheduler, UniprocessorScheduler):
+        return UniprocessorScheduler(scheduler.priority_function, coarsen_processor(scheduler.CPU))
+    return MultiprocessorScheduler(scheduler.priority_function, [coarsen_processor(CPU) for CPU in scheduler.CPUs],
+                                   scheduler.restrict_migration)
+
+
+def multifidelity_breakdown_density(scheduler, task_system, weight, coarsening, density_tolerance=1e-3):
+    """
+    Find the breakdown density by bracketing the breakdown weight in coarsened time before searching the bracket at
+    full resolution.
+
+    The largest weight whose pessimistically coarsened task system is schedulable and the smallest weight whose
+    optimistically coarsened task system is unschedulable bracket the breakdown weight whenever schedulability is
+    sustainable with respect to costs, periods, and deadlines (e.g. for synchronous task systems under preemptive EDF
+    on ideal processors). Since phases, overhead, and cache warmup can cause scheduling anomalies, both ends are
+    validated at full resolution and the bracket is widened until they hold before it is narrowed.
+
+    :param scheduler: scheduler to test schedulability with
+    :param task_system: task system to reweight
+    :param weight: initial weight, which is doubled until the reweighted task system is unschedulable
+    :param coarsening: number of time units per coarse time unit, which must not exceed any period or deadline
+    :param density_tolerance: returns once the densities at either end of the bracket differ by less than this
+    :return: density of the largest schedulable weight found
+    """
+    def density(w):
+        return reweight_task_system(w, task_system).density()
+
+    def bracket(test):
+        """Returns a bracket (schedulable weight, unschedulable weight) around the breakdown weight of a test"""
+        schedulable_weight = 0
+        unschedulable_weight = weight
+        while test(unschedulable_weight):
+            schedulable_weight = unschedulable_weight
+            unschedulable_weight *= 2
+        return _narrow_bracket(lambda candidates: [test(w) for w in candidates], density, schedulable_weight,
+                               unschedulable_weight, density_tolerance, 1)
+
+    def coarse_test(pessimistic):
+        coarse_scheduler = coarsen_scheduler(scheduler, coarsening, pessimistic)
+
+        def test(w):
+            coarse_task_system = coarsen_task_system(reweight_task_system(w, task_system), coarsening, pessimistic)
+            return coarse_scheduler.generate_schedule(coarse_task_system)[1]
+        return test
+
+    @functools.lru_cache(maxsize=None)
+    def full_test(w):
+        return scheduler.generate_schedule(reweight_task_system(w, task_system))[1]
+
+    schedulable_weight, _ = bracket(coarse_test(pessimistic=True))
+    _, unschedulable_weight = bracket(coarse_test(pessimistic=False))
+    if schedulable_weight >= unschedulable_weight:
+        # rounding pessimistically and optimistically disagrees under anomalies, so bracket both
+        schedulable_weight, unschedulable_weight = unschedulable_weight, schedulable_weight
+
+    # validate the bracket at full resolution, widening it where it does not hold
+    while schedulable_weight > 0 and not full_test(schedulable_weight):
+        unschedulable_weight = schedulable_weight
+        # every cost is 1 once weights are small enough, and a weight of 0 stands for that lower limit
+        schedulable_weight = 0 if density(schedulable_weight / 2) == density(schedulable_weight) else \
+            schedulable_weight / 2
+    while full_test(unschedulable_weight):
+        schedulable_weight = unschedulable_weight
+        unschedulable_weight *= 2
+
+    schedulable_weight, _ = _narrow_bracket(lambda candidates: [full_test(w) for w in candidates], density,
+                                            schedulable_weight, unschedulable_weight, density_tolerance, 1)
+    return density(schedulable_weight)
+
+
+def multiprocessor_breakdown_density(scheduler, task_system, utilization_tolerance=1e-3, warm_cache_rate=50,
+                                     num_candidates=1, coarsening=None, executor=None):
+    """
+    Find the density at which a task system, reweighted by a common factor, becomes unschedulable.
+
+    :param scheduler: multiprocessor scheduler to test schedulability with
+    :param task_system: task system to reweight
+    :param utilization_tolerance: tolerance of the returned density
+    :param warm_cache_rate: warm cache rate of the processors, used for the initial weight
+    :param num_candidates: number of weights to test in parallel per search round (see speculative_breakdown_density)
+    :param executor: optional pool or executor to test weights in parallel with (see speculative_breakdown_density)
+    :param coarsening: if provided, bracket the breakdown weight in time coarsened by this factor before searching at
+                       full resolution (see multifidelity_breakdown_density)
+    """
     @functools.lru_cache(maxsize=10)
     def test_weight(weight):
         reweighted_task_system = reweight_task_system(weight, task_system)
@@ -58,6 +291,12 @@ def multiprocessor_breakdown_density(scheduler, task_system, utilization_toleran
     weight = warm_cache_rate * (scheduler.num_processors + len(task_system) / min(task.period
                                                                                   for task in
                                                                                   task_system)) / task_system.utilization()
+    if coarsening is not None:
+        return multifidelity_breakdown_density(scheduler, task_system, weight, coarsening, utilization_tolerance)
+    if num_candidates > 1:
+        return speculative_breakdown_density(scheduler, task_system, weight, utilization_tolerance, num_candidates,
+                                             executor)
+
     weight_step = weight
 
     last_schedulable = False
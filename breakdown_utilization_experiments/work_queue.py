@@ -0,0 +1,263 @@
+from breakdown_utilization_experiments.asynchronous_task_generation import random_task_system
+from breakdown_utilization_experiments.breakdown_density import multiprocessor_breakdown_density, \
+    uniprocessor_breakdown_density
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+from priority_functions import priority_EDF, priority_NP_EDF
+from task_scheduling import MultiprocessorScheduler, Processor, UniprocessorScheduler
+import time
+
+"""
+This module shards breakdown density sweeps into atomic tasks in a shared SQLite file.
+
+Each task is one (task system seed, scheduler, parameter point) combination. Any number of worker processes on any
+number of hosts can drain the queue by leasing tasks, so no external services are needed. Leases that expire (e.g.
+because a worker died) are retried, and result commits are idempotent, so a task that ran twice is recorded once.
+"""
+
+# scheduler name -> (priority function, whether it is a multiprocessor scheduler, whether migration is restricted)
+SCHEDULERS = {
+    "EDF": (priority_EDF, False, False),
+    "NP-EDF": (priority_NP_EDF, False, False),
+    "G-EDF": (priority_EDF, True, False),
+    "GR-EDF": (priority_EDF, True, True),
+    "G-NP-EDF": (priority_NP_EDF, True, False),
+}
+
+
+class WorkQueue:
+    """Queue of experiment tasks stored in an SQLite file"""
+
+    def __init__(self, filename, lease_time=3600, max_attempts=3):
+        """
+        :param filename: SQLite file holding the queue, which must be on storage shared by all workers
+        :param lease_time: seconds a claimed task is leased to a worker before it may be retried elsewhere
+        :param max_attempts: number of times a task is claimed before it is abandoned
+        """
+        self.filename = filename
+        self.lease_time = lease_time
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tasks (task_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                                "lease_owner TEXT, lease_expiry REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+                                "done INTEGER NOT NULL DEFAULT 0)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS results (task_id TEXT PRIMARY KEY, result TEXT NOT NULL, "
+                                "worker TEXT NOT NULL, completed REAL NOT NULL)")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_tasks(self, tasks):
+        """
+        Add tasks to the queue. Tasks that are already present are left unchanged.
+
+        :param tasks: iterable of (task ID, JSON-serializable payload) pairs
+        """
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO tasks (task_id, payload) VALUES (?, ?)",
+                                        ((task_id, json.dumps(payload)) for task_id, payload in tasks))
+
+    def claim(self, worker_id):
+        """
+        Lease a pending task whose lease (if any) has expired.
+
+        :param worker_id: ID of the claiming worker
+        :return: (task ID, payload) pair or None if no task is available
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")  # serializes claims between workers
+        try:
+            row = self.connection.execute("SELECT task_id, payload FROM tasks WHERE done = 0 AND attempts < ? AND "
+                                          "(lease_expiry IS NULL OR lease_expiry < ?) LIMIT 1",
+                                          (self.max_attempts, now)).fetchone()
+            if row is not None:
+                self.connection.execute("UPDATE tasks SET lease_owner = ?, lease_expiry = ?, attempts = attempts + 1 "
+                                        "WHERE task_id = ?", (worker_id, now + self.lease_time, row[0]))
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def renew(self, task_id, worker_id):
+        """Extend a worker's lease on a task. Returns whether the worker still held the lease"""
+        with self.connection:
+            cursor = self.connection.execute("UPDATE tasks SET lease_expiry = ? WHERE task_id = ? AND "
+                                             "lease_owner = ? AND done = 0",
+                                             (time.time() + self.lease_time, task_id, worker_id))
+        return cursor.rowcount > 0
+
+    def release(self, task_id, worker_id):
+        """Give up a worker's lease on a task so that it can be retried immediately"""
+        with self.connection:
+            self.connection.execute("UPDATE tasks SET lease_owner = NULL, lease_expiry = NULL WHERE task_id = ? AND "
+                                    "lease_owner = ? AND done = 0", (task_id, worker_id))
+
+    def complete(self, task_id, worker_id, result):
+        """
+        Commit the result of a task. Only the first result committed for a task is kept.
+
+        :param task_id: ID of the completed task
+        :param worker_id: ID of the worker that completed it
+        :param result: JSON-serializable result
+        """
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO results (task_id, result, worker, completed) "
+                                    "VALUES (?, ?, ?, ?)", (task_id, json.dumps(result), worker_id, time.time()))
+            self.connection.execute("UPDATE tasks SET done = 1 WHERE task_id = ?", (task_id,))
+
+    def num_remaining(self):
+        """Returns the number of tasks that are neither completed nor abandoned"""
+        return self.connection.execute("SELECT COUNT(*) FROM tasks WHERE done = 0 AND attempts < ?",
+                                       (self.max_attempts,)).fetchone()[0]
+
+    def results(self):
+        """Generator of (task ID, payload, result) triples of all completed tasks"""
+        for task_id, payload, result in self.connection.execute(
+                "SELECT tasks.task_id, tasks.payload, results.result FROM tasks JOIN results "
+                "ON tasks.task_id = results.task_id ORDER BY tasks.task_id"):
+            yield task_id, json.loads(payload), json.loads(result)
+
+
+def sweep_tasks(seeds, schedulers, parameter_name, parameter_values, num_tasks, num_processors=1,
+                warm_cache_rate=50):
+    """
+    Split a breakdown density sweep into atomic tasks.
+
+    :param seeds: random seeds of the task systems to generate
+    :param schedulers: names of schedulers (keys of SCHEDULERS) to evaluate
+    :param parameter_name: processor parameter being swept (e.g. "preemption_cost" or "cache_warmup_time")
+    :param parameter_values: values of the swept parameter
+    :param num_tasks: number of tasks per task system
+    :param num_processors: number of processors for multiprocessor schedulers
+    :param warm_cache_rate: warm cache rate of the processors
+    :return: generator of (task ID, payload) pairs for WorkQueue.add_tasks
+    """
+    for seed in seeds:
+        for scheduler in schedulers:
+            for value in parameter_values:
+                yield f"{seed}:{scheduler}:{parameter_name}={value}:n={num_tasks}:m={num_processors}:" \
+                      f"w={warm_cache_rate}", {
+                    "seed": seed, "scheduler": scheduler, "parameter_name": parameter_name, "parameter": value,
+                    "num_tasks": num_tasks, "num_processors": num_processors, "warm_cache_rate": warm_cache_rate
+                }
+
+
+def breakdown_density_task(payload):
+    """Compute the breakdown density for a task created by sweep_tasks"""
+    random.seed(payload["seed"])
+    task_system = random_task_system(payload["num_tasks"])
+    priority_function, multiprocessor, restrict_migration = SCHEDULERS[payload["scheduler"]]
+
+    def processor():
+        return Processor(warm_cache_rate=payload["warm_cache_rate"],
+                         **{payload["parameter_name"]: payload["parameter"]})
+
+    if multiprocessor:
+        scheduler = MultiprocessorScheduler(priority_function, [processor() for _ in range(payload["num_processors"])],
+                                            restrict_migration=restrict_migration)
+        return multiprocessor_breakdown_density(scheduler, task_system, warm_cache_rate=payload["warm_cache_rate"])
+
+    scheduler = UniprocessorScheduler(priority_function, processor())
+    return uniprocessor_breakdown_density(scheduler, task_system, warm_cache_rate=payload["warm_cache_rate"])
+
+
+def _renew_lease(filename, task_id, worker_id, lease_time, stop):
+    """Renew a worker's lease on a task every third of the lease time until :stop: is set or the lease is lost"""
+    with WorkQueue(filename, lease_time=lease_time) as queue:  # SQLite connections cannot be shared by threads
+        while not stop.wait(lease_time / 3):
+            if not queue.renew(task_id, worker_id):
+                return
+
+
+def run_worker(filename, handler=breakdown_density_task, worker_id=None, lease_time=3600, poll_interval=None):
+    """
+    Drain a work queue, committing the result of each task it claims.
+
+    :param filename: SQLite file holding the queue
+    :param handler: function computing the JSON-serializable result of a task from its payload
+    :param worker_id: ID of this worker. Defaults to the host name and process ID
+    :param lease_time: seconds each claimed task is leased for. Leases are renewed while tasks run, so tasks may
+                       run longer than this without being claimed by other workers
+    :param poll_interval: if provided, keep polling for expired leases every poll_interval seconds until all tasks
+                          are done instead of returning as soon as no task can be claimed
+    :return: number of tasks completed by this worker
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    num_completed = 0
+    with WorkQueue(filename, lease_time=lease_time) as queue:
+        while True:
+            claimed = queue.claim(worker_id)
+            if claimed is None:
+                if poll_interval is None or queue.num_remaining() == 0:
+                    return num_completed
+                time.sleep(poll_interval)
+                continue
+
+            task_id, payload = claimed
+            stop_renewing = threading.Event()
+            heartbeat = threading.Thread(target=_renew_lease, args=(filename, task_id, worker_id, lease_time,
+                                                                    stop_renewing), daemon=True)
+            heartbeat.start()
+            try:
+                result = handler(payload)
+            except BaseException:
+                queue.release(task_id, worker_id)
+                raise
+            finally:
+                stop_renewing.set()
+                heartbeat.join()
+            queue.complete(task_id, worker_id, result)
+            num_completed += 1
+
+
+def merge_results(filename):
+    """
+    Average the results of completed sweeps over task systems, keeping sweeps that share a queue file apart.
+
+    :param filename: SQLite file holding the queue
+    :return: dictionary mapping each sweep (parameter_name, num_tasks, num_processors, warm_cache_rate) to a
+             dictionary mapping (scheduler, parameter) to the mean result over all seeds
+    """
+    totals = {}
+    with WorkQueue(filename) as queue:
+        for _, payload, result in queue.results():
+            sweep = (payload["parameter_name"], payload["num_tasks"], payload["num_processors"],
+                     payload["warm_cache_rate"])
+            key = (payload["scheduler"], payload["parameter"])
+            sweep_totals = totals.setdefault(sweep, {})
+            total, count = sweep_totals.get(key, (0, 0))
+            sweep_totals[key] = (total + result, count + 1)
+    return {sweep: {key: total / count for key, (total, count) in sweep_totals.items()}
+            for sweep, sweep_totals in totals.items()}
+
+
+def write_figure_input(filename, merged_results, line_format):
+    """
+    Write merged sweep results in the input format of a figures/ script.
+
+    :param filename: name of file to write to (e.g. "preemption_test")
+    :param merged_results: results of one sweep in the output of merge_results
+    :param line_format: format of each line with {scheduler}, {parameter}, and {density} fields. For instance,
+                        "{scheduler} {parameter} {density}" for uniprocessor_cache_warmup_output,
+                        "{scheduler} {parameter} 0 {density}" for multiprocessor_cache_warmup_output, and
+                        "{scheduler} 0 0 {parameter} {density}" for preemption_test
+    """
+    with open(filename, "w") as file:
+        for (scheduler, parameter), density in sorted(merged_results.items()):
+            file.write(line_format.format(scheduler=scheduler, parameter=parameter, density=density) + "\n")
@@ -0,0 +1,261 @@
+from fractions import Fraction
+from math import inf
+from multiprocessing import current_process, get_context
+from os import cpu_count
+from feasibility_horizons import feasibility_horizon
+from schedule_sinks import ScheduleSink
+from task_scheduling import MultiprocessorScheduler, Schedule, SimulationResult
+from task_systems import PeriodicTaskSystem
+
+"""
+This module schedules on processors grouped into clusters (e.g. cores sharing a cache), with global scheduling inside
+each cluster and no migration between clusters.
+
+Tasks are assigned to clusters by a bin-packing heuristic before simulation. Since clusters share no jobs, each
+cluster is simulated on its own by a MultiprocessorScheduler with the cluster's processors and their overhead and
+cache parameters, and the clusters are simulated concurrently in forked worker processes. Simulating many small
+clusters is much cheaper than one global simulation on all processors, whose cost grows with the number of
+processors at every scheduling decision.
+"""
+
+
+def exact_utilization(task):
+    """Returns the utilization of a task as an exact fraction, so that packing is not affected by rounding"""
+    return 0 if task.period == inf else Fraction(task.cost) / Fraction(task.period)
+
+
+def exact_density(task):
+    """Returns the density of a task as an exact fraction"""
+    return Fraction(task.cost) / Fraction(min(task.period, task.relative_deadline))
+
+
+def cluster_capacity(cluster):
+    """Returns the total size of tasks a cluster can hold, i.e. its number of processors times its fastest rate"""
+    return len(cluster) * max(CPU.warm_cache_rate for CPU in cluster)
+
+
+def _fit_decreasing(tasks, clusters, size, choose):
+    """
+    Assign tasks in order of decreasing size to clusters with enough remaining capacity.
+
+    :param choose: function of the candidate cluster indices and the remaining capacity of each cluster after
+                   adding the task, returning the cluster to assign the task to
+    :return: list of the tasks assigned to each cluster or None if some task fits in no cluster
+    """
+    capacities = [cluster_capacity(cluster) for cluster in clusters]
+    max_task_sizes = [max(CPU.warm_cache_rate for CPU in cluster) for cluster in clusters]
+    loads = [0] * len(clusters)
+    assignment = [[] for _ in clusters]
+
+    for task in sorted(tasks, key=size, reverse=True):
+        task_size = size(task)
+        remaining = {idx: capacities[idx] - loads[idx] - task_size for idx in range(len(clusters))
+                     if task_size <= max_task_sizes[idx] and loads[idx] + task_size <= capacities[idx]}
+        if len(remaining) == 0:
+            return None
+
+        idx = choose(list(remaining), remaining)
+        loads[idx] += task_size
+        assignment[idx].append(task)
+    return assignment
+
+
+def first_fit_decreasing(tasks, clusters, size=exact_utilization):
+    """
+    Assign each task, from largest to smallest, to the first cluster it fits in.
+
+    :param tasks: tasks to assign
+    :param clusters: list of clusters, each a list of processors
+    :param size: function returning the size of a task (e.g. exact_utilization or exact_density)
+    :return: list of the tasks assigned to each cluster or None if the tasks do not fit
+    """
+    return _fit_decreasing(tasks, clusters, size, lambda candidates, remaining: candidates[0])
+
+
+def best_fit_decreasing(tasks, clusters, size=exact_utilization):
+    """Assign each task, from largest to smallest, to the cluster it leaves the least capacity in"""
+    return _fit_decreasing(tasks, clusters, size, lambda candidates, remaining: min(candidates, key=remaining.get))
+
+
+def worst_fit_decreasing(tasks, clusters, size=exact_utilization):
+    """Assign each task, from largest to smallest, to the cluster it leaves the most capacity in"""
+    return _fit_decreasing(tasks, clusters, size, lambda candidates, remaining: max(candidates, key=remaining.get))
+
+
+def split_into_clusters(processors, cluster_size):
+    """Returns consecutive clusters of :cluster_size: processors (the last cluster may be smaller)"""
+    if cluster_size < 1:
+        raise ValueError("Clusters must contain at least one processor!")
+    return [processors[idx:idx + cluster_size] for idx in range(0, len(processors), cluster_size)]
+
+
+class ClusteredSimulationResult(SimulationResult):
+    """Outcome of generating a clustered schedule, along with the outcome of each cluster"""
+
+    def __init__(self, schedule, schedulable, final_time, deadline_miss=None, exceeded_limit=None, horizon=None,
+                 assignment=None, cluster_results=None):
+        """
+        :param assignment: list of the tasks assigned to each cluster (None if the tasks could not be assigned)
+        :param cluster_results: SimulationResult of each cluster, whose processors are numbered within the cluster
+        """
+        super().__init__(schedule, schedulable, final_time, deadline_miss, exceeded_limit, horizon)
+        self.assignment = assignment
+        self.cluster_results = cluster_results
+
+
+class _ClusterSink(ScheduleSink):
+    """Forwards intervals of a cluster's simulation to a sink, numbering processors across all clusters"""
+
+    def __init__(self, sink, processor_offset):
+        self.sink = sink
+        self.processor_offset = processor_offset
+
+    def add(self, scheduled_job, processor_idx):
+        self.sink.add(scheduled_job, self.processor_offset + processor_idx)
+
+    def job_released(self, job):
+        self.sink.job_released(job)
+
+    def deadline_missed(self, deadline_miss):
+        self.sink.deadline_missed(deadline_miss)
+
+
+# Cluster simulations of the current schedule, their final time and budget, inherited by forked workers
+_shared_cluster_simulations = None
+
+
+def _simulate_shared_cluster(simulation_idx):
+    simulations, final_time, budget = _shared_cluster_simulations
+    scheduler, task_system, _ = simulations[simulation_idx]
+    return scheduler.simulate(task_system, final_time, budget=budget)
+
+
+class ClusteredScheduler:
+    """
+    Entity that schedules on clusters of processors, with global scheduling within each cluster.
+
+    Each simulation assigns the tasks to clusters and simulates every cluster on copies of its processors, so one
+    scheduler can serve concurrent calls like the other schedulers.
+    """
+
+    def __init__(self, priority_function, clusters, packing=first_fit_decreasing, size=exact_utilization,
+                 restrict_migration=False, processes=None):
+        """
+        :param priority_function: job priority function to use within each cluster
+        :param clusters: list of clusters, each a list of processors with the cluster's overhead and cache parameters
+                         (e.g. from split_into_clusters)
+        :param packing: function assigning tasks to clusters (first_fit_decreasing, best_fit_decreasing,
+                        worst_fit_decreasing, or any function with their signature)
+        :param size: function returning the size of a task for packing (e.g. exact_utilization or exact_density)
+        :param restrict_migration: whether job migration between the processors of a cluster is restricted
+        :param processes: number of forked worker processes simulating clusters concurrently. Defaults to the number
+                          of CPUs. With 1, or when called from a worker process of another pool, clusters are
+                          simulated in this process one after another
+        """
+        if any(len(cluster) == 0 for cluster in clusters):
+            raise ValueError("Clusters must contain at least one processor!")
+
+        self.priority_function = priority_function
+        self.clusters = clusters
+        self.packing = packing
+        self.size = size
+        self.processes = processes
+        self.schedulers = [MultiprocessorScheduler(priority_function, cluster, restrict_migration)
+                           for cluster in clusters]
+        self.num_processors = sum(len(cluster) for cluster in clusters)
+
+    def generate_schedule(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Generate a schedule for a provided task system
+
+        :param task_system: periodic task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of each cluster's tasks
+        :param sink: optional sink that receives scheduled intervals as they close, with processors numbered across
+                     all clusters
+        :param release_schedule: unsupported, since jobs are created per cluster
+        :param budget: optional SimulationBudget limiting the resources used by each cluster's simulation
+        :return: list of schedules (one per processor, cluster by cluster) and whether the task system is schedulable
+                 (None if this was not decided within budget)
+        """
+        result = self.simulate(task_system, final_time, sink, release_schedule, budget)
+        return result.schedule, result.schedulable
+
+    def simulate(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Assign tasks to clusters and generate the schedule of every cluster, each stopping as soon as any of its jobs
+        misses its deadline
+
+        :param task_system: periodic task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of each cluster's tasks
+        :param sink: optional sink that receives scheduled intervals as they close, with processors numbered across
+                     all clusters. A sink cannot be shared with worker processes, so clusters are then simulated in
+                     this process
+        :param release_schedule: unsupported, since jobs are created per cluster
+        :param budget: optional SimulationBudget limiting the resources used by each cluster's simulation
+        :return: ClusteredSimulationResult with the list of schedules (one per processor, cluster by cluster), whether
+                 the task system is schedulable, and the earliest deadline miss of any cluster. Schedules simulated
+                 by worker processes refer to copies of the tasks
+        """
+        global _shared_cluster_simulations
+
+        if release_schedule is not None or hasattr(task_system, "jobs"):
+            raise ValueError("Clustered scheduling requires periodic tasks, which it creates jobs from per cluster!")
+
+        assignment = self.packing(task_system.tasks, self.clusters, self.size)
+        if assignment is None:
+            if final_time is None:
+                final_time = feasibility_horizon(task_system).final_time
+            return ClusteredSimulationResult([Schedule() for _ in range(self.num_processors)], False, final_time,
+                                             assignment=None)  # not schedulable
+
+        simulations = []  # (scheduler, task system, index of its first processor) of each cluster with tasks
+        processor_offset = 0
+        for scheduler, tasks in zip(self.schedulers, assignment):
+            if len(tasks) > 0:
+                simulations.append((scheduler, PeriodicTaskSystem(tasks), processor_offset))
+            processor_offset += scheduler.num_processors
+
+        # worker processes of other pools (e.g. experiments) are daemons, which cannot fork workers of their own
+        if sink is not None or self.processes == 1 or len(simulations) <= 1 or current_process().daemon:
+            results = [scheduler.simulate(cluster_task_system, final_time,
+                                          None if sink is None else _ClusterSink(sink, processor_offset),
+                                          budget=budget)
+                       for scheduler, cluster_task_system, processor_offset in simulations]
+        else:
+            _shared_cluster_simulations = (simulations, final_time, budget)
+            try:
+                processes = min(self.processes or cpu_count(), len(simulations))
+                with get_context("fork").Pool(processes) as pool:
+                    results = pool.map(_simulate_shared_cluster, range(len(simulations)), chunksize=1)
+            finally:
+                _shared_cluster_simulations = None
+
+        return self._combine(assignment, results)
+
+    def _combine(self, assignment, results):
+        """Combine the results of the simulated clusters into the result of the whole system"""
+        cluster_results = []
+        remaining_results = iter(results)
+        for cluster, tasks in zip(self.clusters, assignment):
+            if len(tasks) > 0:
+                cluster_results.append(next(remaining_results))
+            else:
+                cluster_results.append(SimulationResult([Schedule() for _ in cluster], True, 0))
+
+        schedules = [schedule for result in cluster_results for schedule in result.schedule]
+        if any(result.schedulable is False for result in cluster_results):
+            schedulable = False
+        elif any(result.schedulable is None for result in cluster_results):
+            schedulable = None
+        else:
+            schedulable = True
+
+        deadline_misses = [result.deadline_miss for result in cluster_results if result.deadline_miss is not None]
+        exceeded_limits = [result.exceeded_limit for result in cluster_results if result.exceeded_limit is not None]
+        horizons = {result.horizon for result in results}
+        return ClusteredSimulationResult(
+            schedules, schedulable, max(result.final_time for result in cluster_results),
+            deadline_miss=min(deadline_misses, key=lambda deadline_miss: deadline_miss.time, default=None),
+            exceeded_limit=exceeded_limits[0] if len(exceeded_limits) > 0 else None,
+            horizon=horizons.pop() if len(horizons) == 1 else None, assignment=assignment,
+            cluster_results=cluster_results)
@@ -0,0 +1,106 @@
+from math import inf
+from random import Random
+from admission_control import EDFAdmissionController, FixedPriorityAdmissionController, deadline_monotonic, \
+    rate_monotonic
+from priority_functions import priority_DM, priority_EDF, priority_LLF, priority_RM
+from schedule_analytics import ScheduleAnalytics
+from schedule_sinks import AnalyticsSink, MetricsSink
+from task_scheduling import MultiprocessorScheduler, Processor, UniprocessorScheduler
+from task_systems import PeriodicTask, PeriodicTaskSystem
+
+"""
+This module cross-checks analyses against simulation on random task systems.
+
+Admission controllers must never admit a task system that misses a deadline when simulated (and the exact EDF
+controller must admit every synchronous task system that does not), and the metrics of ScheduleAnalytics must not
+depend on whether a schedule was streamed to an AnalyticsSink or added from the completed schedules (and must agree
+with the MetricsSink). Run this module
+to check both, e.g. after changing the simulators, the sinks or the analyses.
+"""
+
+
+def _random_task(rng, task_id, one_shot_rate=0.2):
+    """Returns a synchronous task with small integer parameters, which is a one-shot task with some probability"""
+    cost = rng.randint(1, 6)
+    if rng.random() < one_shot_rate:
+        return PeriodicTask(period=inf, cost=cost, relative_deadline=rng.randint(cost, 30), id=task_id)
+    period = rng.choice([4, 5, 6, 8, 10, 12, 15, 20, 24, 30])
+    cost = min(cost, period)
+    return PeriodicTask(period=period, cost=cost, relative_deadline=rng.randint(cost, period), id=task_id)
+
+
+def check_admission_control(num_systems=200, num_tasks=5, seed=0):
+    """
+    Admit random tasks one by one and simulate every task system after each admission decision.
+
+    :param num_systems: number of random task systems
+    :param num_tasks: number of tasks offered to the controllers per task system
+    :param seed: seed of the random task systems
+    :return: list of (controller name, task system, admitted, schedulable) of every decision contradicting simulation
+    """
+    rng = Random(seed)
+    configurations = [("EDF", lambda: EDFAdmissionController(), priority_EDF, True),
+                      ("RM", lambda: FixedPriorityAdmissionController(rate_monotonic), priority_RM, False),
+                      ("DM", lambda: FixedPriorityAdmissionController(deadline_monotonic), priority_DM, False)]
+
+    mismatches = []
+    for _ in range(num_systems):
+        tasks = [_random_task(rng, task_id) for task_id in range(num_tasks)]
+        for name, controller_factory, priority_function, exact in configurations:
+            controller = controller_factory()
+            admitted_tasks = []
+            for task in tasks:
+                admitted = controller.admit(task)
+                task_system = PeriodicTaskSystem(admitted_tasks + [task])
+                schedulable = UniprocessorScheduler(priority_function).simulate(task_system).schedulable
+                if (admitted and not schedulable) or (exact and schedulable and not admitted):
+                    mismatches.append((name, task_system, admitted, schedulable))
+                if admitted:
+                    admitted_tasks.append(task)
+    return mismatches
+
+
+def _analytics_metrics(analytics):
+    return (analytics.deadline_misses(), analytics.preemptions(), analytics.migrations(),
+            analytics.overhead_per_task(), analytics.max_response_times(), list(analytics.busy_time()))
+
+
+def check_schedule_analytics(num_systems=200, num_tasks=6, num_processors=3, seed=0):
+    """
+    Compare the metrics of random multiprocessor LLF schedules streamed to an AnalyticsSink with those of the same
+    schedules added to a sink after simulation, and their preemptions with those counted by a MetricsSink.
+
+    :param num_systems: number of random task systems
+    :param num_tasks: number of tasks per task system
+    :param num_processors: number of processors
+    :param seed: seed of the random task systems
+    :return: list of the task systems whose metrics differ
+    """
+    rng = Random(seed)
+    mismatches = []
+    for _ in range(num_systems):
+        task_system = PeriodicTaskSystem([_random_task(rng, task_id, one_shot_rate=0) for task_id in range(num_tasks)])
+        processors = [Processor(preemption_cost=1) for _ in range(num_processors)]
+        scheduler = MultiprocessorScheduler(priority_LLF, processors)
+
+        sink = AnalyticsSink()
+        streamed = scheduler.simulate(task_system, sink=sink)
+        result = scheduler.simulate(task_system)
+        metrics = MetricsSink()
+        scheduler.simulate(task_system, sink=metrics)
+        sink.num_processors = num_processors
+        analytics = ScheduleAnalytics(result.schedule, end_time=result.final_time)
+        if (_analytics_metrics(ScheduleAnalytics(sink, end_time=streamed.final_time)) != _analytics_metrics(analytics)
+                or metrics.num_preemptions != sum(analytics.preemptions().values())):
+            mismatches.append(task_system)
+    return mismatches
+
+
+if __name__ == "__main__":
+    admission_mismatches = check_admission_control()
+    for name, task_system, admitted, schedulable in admission_mismatches:
+        print(f"{name}: admitted={admitted} schedulable={schedulable} {[str(task) for task in task_system]}")
+    analytics_mismatches = check_schedule_analytics()
+    for task_system in analytics_mismatches:
+        print(f"Analytics differ: {[str(task) for task in task_system]}")
+    print(f"{len(admission_mismatches)} admission and {len(analytics_mismatches)} analytics mismatches")
@@ -10,7 +10,7 @@ t3 = PeriodicTask(period=12, cost=4, id=2)
 task_system = PeriodicTaskSystem([t1, t2, t3])
 
 scheduler = UniprocessorScheduler(priority_function=priority_RM)
-schedule = scheduler.generate_schedule(task_system=task_system)[0]
+schedule = scheduler.generate_schedule(task_system=task_system, final_time=task_system.hyperperiod)[0]
 
 plot_uniprocessor_schedule(schedule)
 plt.tight_layout()
@@ -7,8 +7,8 @@ import matplotlib.pyplot as plt
 t1 = PeriodicTask(phase=0, period=100, cost=60, relative_deadline=100, id=0)
 t2 = PeriodicTask(phase=10, period=100, cost=60, relative_deadline=80, id=1)
 t3 = PeriodicTask(phase=20, period=100, cost=60, relative_deadline=60, id=2)
-t4 = PeriodicTask(phase=30, period=100, cost=40, relative_deadline=40, id=3)
-t5 = PeriodicTask(phase=40, period=100, cost=20, relative_deadline=20, id=4)
+t4 = PeriodicTask(phase=30, period=100, cost=40, relative_deadline=45, id=3)
+t5 = PeriodicTask(phase=40, period=100, cost=20, relative_deadline=35, id=4)
 
 task_system = PeriodicTaskSystem([t1, t2, t3, t4, t5])
 print(task_system.utilization(), task_system.density())
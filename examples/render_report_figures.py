@@ -0,0 +1,54 @@
+from priority_functions import *
+from task_scheduling import *
+from task_systems import *
+from schedule_plotting import *
+from schedule_rendering import RenderJob, render_all
+import os
+
+# Renders the example schedule figures of the report in parallel. Figures whose schedules and plotting code are
+# unchanged since the last run are skipped
+
+report_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "report")
+
+
+def RM_schedule():
+    task_system = PeriodicTaskSystem([PeriodicTask(period=6, cost=1, id=0),
+                                      PeriodicTask(period=8, cost=2, id=1),
+                                      PeriodicTask(period=12, cost=4, id=2)])
+    return UniprocessorScheduler(priority_function=priority_RM).generate_schedule(
+        task_system=task_system, final_time=task_system.hyperperiod)[0]
+
+
+def multiprocessor_schedules(priority_function, relative_deadlines, costs, final_time):
+    def schedules():
+        task_system = PeriodicTaskSystem([PeriodicTask(phase=10 * i, period=100, cost=cost, relative_deadline=deadline,
+                                                       id=i)
+                                          for i, (cost, deadline) in enumerate(zip(costs, relative_deadlines))])
+        scheduler = MultiprocessorScheduler(priority_function=priority_function,
+                                            processors=[Processor(), Processor(), Processor()],
+                                            restrict_migration=False)
+        return scheduler.generate_schedule(task_system=task_system, final_time=final_time)[0]
+
+    return schedules
+
+
+EDF_schedules = multiprocessor_schedules(priority_NP_EDF, [100, 80, 60, 45, 35], [60, 60, 60, 40, 20], 200)
+Pfair_schedules = multiprocessor_schedules(priority_Pfair, [100, 80, 60, 60, 60], [60, 60, 60, 40, 40], 100)
+
+render_jobs = [
+    RenderJob(RM_schedule, plot_uniprocessor_schedule, "RM_uniprocessor_example.pdf"),
+    RenderJob(EDF_schedules, plot_multiprocessor_schedule_per_processor, "EDF_multiprocessor_example1.pdf"),
+    RenderJob(EDF_schedules, plot_multiprocessor_schedule_per_task, "EDF_multiprocessor_example2.pdf"),
+    RenderJob(EDF_schedules, plot_external_legend, "EDF_multiprocessor_legend1.pdf", plot_kwargs={"entity": "Task"},
+              tight_layout=False),
+    RenderJob(EDF_schedules, plot_external_legend, "EDF_multiprocessor_legend2.pdf",
+              plot_kwargs={"entity": "Processor"}, tight_layout=False),
+    RenderJob(Pfair_schedules, plot_multiprocessor_schedule_per_processor, "Pfair_multiprocessor_example1.pdf"),
+    RenderJob(Pfair_schedules, plot_multiprocessor_schedule_per_task, "Pfair_multiprocessor_example2.pdf"),
+]
+for render_job in render_jobs:
+    render_job.filename = os.path.join(report_directory, render_job.filename)
+
+if __name__ == "__main__":
+    rendered = render_all(render_jobs)
+    print(f"Rendered {sum(rendered)} of {len(render_jobs)} figures")
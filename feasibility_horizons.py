@@ -0,0 +1,142 @@
+from fractions import Fraction
+from math import inf
+from task_systems import Job
+
+"""
+This module computes feasibility horizons: times by which a deadline miss must occur if a task system is not
+schedulable, so that simulating until the horizon decides schedulability.
+
+The generic horizon (2 * hyperperiod + max D + max phase) holds for any configuration. Tighter horizons are proven for
+preemptive scheduling on a single ideal processor (without overhead or cache effects) when the priority function's
+scheduling_class is known:
+    - Synchronous task systems with EDF: every job released in the first busy period completes by its end, and a
+      deadline miss of EDF implies one within it.
+    - Synchronous task systems with fixed priorities: the synchronous release is a critical instant, so a deadline
+      miss occurs within the first busy period, or by the first deadline of each task if D <= T.
+    - Asynchronous task systems with D <= T: a deadline miss occurs by max phase + 2 * hyperperiod with EDF (Leung and
+      Merrill) and by S_n + hyperperiod with fixed priorities (Goossens and Devillers), where S_n is the time from
+      which the fixed-priority schedule is periodic.
+Fixed-priority horizons require distinct task priorities, since ties are broken dynamically by the schedulers.
+"""
+
+GENERIC = "2P + max D + max phase"
+HYPERPERIOD = "hyperperiod"
+BUSY_PERIOD = "synchronous busy period"
+CRITICAL_INSTANT = "critical instant"
+LEUNG_MERRILL = "max phase + 2P"
+PERIODIC_FROM_S_N = "S_n + P"
+
+
+class FeasibilityHorizon:
+    """Time until which simulation decides schedulability, along with the bound it follows from"""
+
+    def __init__(self, final_time, bound):
+        """
+        :param final_time: time by which a deadline miss must occur if the task system is not schedulable
+        :param bound: name of the bound (one of the module's constants)
+        """
+        self.final_time = final_time
+        self.bound = bound
+
+    def __str__(self):
+        return f"Horizon {self.final_time} ({self.bound})"
+
+
+def synchronous_busy_period(tasks):
+    """
+    Returns the length of the busy period starting at a synchronous release of tasks with utilization <= 1, i.e. the
+    smallest t > 0 at which all work released before t has been executed by a work-conserving scheduler. The busy
+    period is infinite if the utilization is 1 and there are one-shot (infinite period) tasks.
+    """
+    if any(task.period == inf for task in tasks) and \
+            sum(Fraction(task.cost) / Fraction(task.period) for task in tasks if task.period != inf) == 1:
+        return inf
+
+    length = sum(task.cost for task in tasks)
+    while True:
+        demand = sum(task.cost if task.period == inf else -(-length // task.period) * task.cost for task in tasks)
+        if demand == length:
+            return length
+        length = demand
+
+
+def _is_ideal(CPU):
+    """Returns whether a processor executes exactly one unit of work per time unit without overhead"""
+    return CPU.schedule_cost == 0 and CPU.dispatch_cost == 0 and CPU.preemption_cost == 0 and \
+        CPU.warm_cache_rate == 1
+
+
+def _task_priorities(tasks, priority_function):
+    """Returns the fixed priority of each task or None if any two tasks share a priority"""
+    priorities = [priority_function(Job(release=task.phase, cost=task.cost,
+                                        deadline=task.phase + task.relative_deadline, task=task), task.phase)
+                  for task in tasks]
+    if len(set(priorities)) != len(priorities):
+        return None
+    return priorities
+
+
+def _periodic_schedule_start(tasks, priorities):
+    """Returns S_n, the time from which the fixed-priority schedule of an asynchronous task system is periodic"""
+    start = 0
+    for idx, (_, task) in enumerate(sorted(zip(priorities, tasks), key=lambda pair: pair[0])):
+        if idx == 0:
+            start = task.phase
+        else:
+            start = task.phase + -(-max(start - task.phase, 0) // task.period) * task.period
+    return start
+
+
+def _generic_horizon(task_system):
+    if all(task.phase == 0 for task in task_system.tasks) and \
+            all(task.relative_deadline <= task.period != inf for task in task_system.tasks):
+        # For synchronous task systems with relative deadlines not exceeding periods, a deadline miss must
+        # occur by the hyperperiod. One-shot tasks may have deadlines after the hyperperiod, so they are excluded
+        return FeasibilityHorizon(task_system.hyperperiod, HYPERPERIOD)
+
+    # Result by Leung and Merrill: If a deadline is missed in a periodic task system with
+    # utilization <= 1, then it will be missed by time 2*P + max(D_i) + max(s_i)
+    return FeasibilityHorizon(2 * task_system.hyperperiod + max(task.relative_deadline for task in task_system.tasks) +
+                              max(task.phase for task in task_system.tasks), GENERIC)
+
+
+def feasibility_horizon(task_system, processors=None, priority_function=None):
+    """
+    Compute the tightest feasibility horizon proven for a scheduling configuration.
+
+    :param task_system: task system to schedule
+    :param processors: a single processor (uniprocessor scheduling) or list of processors. Defaults to assuming
+                       nothing about the processors
+    :param priority_function: priority function to schedule with. Defaults to assuming nothing about it
+    :return: FeasibilityHorizon
+    """
+    horizons = [_generic_horizon(task_system)]
+
+    if processors is not None and not isinstance(processors, list):
+        processors = [processors]
+    scheduling_class = getattr(priority_function, "scheduling_class", None)
+    tasks = task_system.tasks
+    if processors is None or len(processors) != 1 or not _is_ideal(processors[0]) or scheduling_class is None or \
+            sum(Fraction(task.cost) / Fraction(task.period) for task in tasks if task.period != inf) > 1:
+        return horizons[0]
+
+    priorities = None
+    if scheduling_class == "fixed priority":
+        priorities = _task_priorities(tasks, priority_function)
+        if priorities is None:
+            return horizons[0]
+
+    constrained = all(task.relative_deadline <= task.period for task in tasks)
+    if all(task.phase == 0 for task in tasks):
+        horizons.append(FeasibilityHorizon(synchronous_busy_period(tasks), BUSY_PERIOD))
+        if scheduling_class == "fixed priority" and constrained:
+            horizons.append(FeasibilityHorizon(max(task.relative_deadline for task in tasks), CRITICAL_INSTANT))
+    elif constrained and all(task.period != inf for task in tasks):
+        if scheduling_class == "EDF":
+            horizons.append(FeasibilityHorizon(max(task.phase for task in tasks) + 2 * task_system.hyperperiod,
+                                               LEUNG_MERRILL))
+        else:
+            horizons.append(FeasibilityHorizon(_periodic_schedule_start(tasks, priorities) + task_system.hyperperiod,
+                                               PERIODIC_FROM_S_N))
+
+    return min(horizons, key=lambda horizon: horizon.final_time)
@@ -0,0 +1,164 @@
+from math import inf
+import mmap
+import struct
+from task_systems import Job
+
+"""
+This module replays job release traces (e.g. captured from production systems) instead of periodic task systems.
+
+A trace is a binary file with a header followed by one fixed-size record per job in order of release. Each record
+holds the release time, execution cost and absolute deadline as little-endian 64-bit integers and the task ID as a
+little-endian 32-bit integer. Traces are memory-mapped and parsed lazily, so jobs with jitter, sporadic releases and
+variable execution times stream into the schedulers without a list of all jobs ever being built.
+
+A JobTrace can be passed to a scheduler's generate_schedule in place of a task system.
+"""
+
+_MAGIC = b"JOBTRC01"
+_RECORD = struct.Struct("<qqqi")  # release, cost, deadline, task ID
+
+
+def write_job_trace(filename, jobs):
+    """
+    Write a job trace.
+
+    :param filename: name of file to write to
+    :param jobs: iterable of (release, cost, deadline, task ID) tuples in order of release
+    :return: number of jobs written
+    """
+    num_jobs = 0
+    last_release = -inf
+    with open(filename, "wb") as file:
+        file.write(_MAGIC)
+        for release, cost, deadline, task_id in jobs:
+            if release < last_release:
+                raise ValueError(f"Job released at {release} is out of release order!")
+            if cost <= 0 or deadline <= release:
+                raise ValueError(f"Job released at {release} must have positive cost and relative deadline!")
+            file.write(_RECORD.pack(release, cost, deadline, task_id))
+            last_release = release
+            num_jobs += 1
+    return num_jobs
+
+
+class TraceTask:
+    """A task that released jobs in a trace, summarized by the parameters priority functions depend on"""
+
+    def __init__(self, id, phase, period, cost, relative_deadline):
+        """
+        :param id: task ID
+        :param phase: release time of the task's first job
+        :param period: minimum time between releases of the task's jobs (inf if it released a single job)
+        :param cost: maximum execution cost of the task's jobs
+        :param relative_deadline: maximum relative deadline of the task's jobs
+        """
+        self.id = id
+        self.phase = phase
+        self.period = period
+        self.cost = cost
+        self.relative_deadline = relative_deadline
+
+    def __str__(self):
+        return f"Task {self.id} (phi={self.phase}, T>={self.period}, C<={self.cost}, D<={self.relative_deadline})"
+
+    def utilization(self):
+        return self.cost / self.period
+
+    def density(self):
+        return self.cost / self.relative_deadline
+
+
+class JobTrace:
+    """Jobs replayed from a memory-mapped trace file, which acts as both task system and release schedule"""
+
+    def __init__(self, filename):
+        """
+        :param filename: name of trace file written by write_job_trace
+        """
+        self.file = open(filename, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(_MAGIC)] != _MAGIC or (len(self.map) - len(_MAGIC)) % _RECORD.size != 0:
+            self.close()
+            raise ValueError(f"{filename} is not a job trace!")
+
+        self.num_jobs = (len(self.map) - len(_MAGIC)) // _RECORD.size
+        self.tasks = []
+        self.total_cost = 0
+        self.first_release = 0
+        self.final_time = 0  # the last deadline, by which every job in the trace must complete
+        self._summarize()
+
+    def _summarize(self):
+        """Summarize the trace's tasks in a single pass over it"""
+        summaries = {}  # task ID -> [phase, last release, period, cost, relative deadline]
+        total_cost = 0
+        final_time = 0
+        for release, cost, deadline, task_id in self._records():
+            summary = summaries.get(task_id)
+            if summary is None:
+                summaries[task_id] = [release, release, inf, cost, deadline - release]
+            else:
+                if release - summary[1] < summary[2]:
+                    summary[2] = release - summary[1]
+                if cost > summary[3]:
+                    summary[3] = cost
+                if deadline - release > summary[4]:
+                    summary[4] = deadline - release
+                summary[1] = release
+            total_cost += cost
+            if deadline > final_time:
+                final_time = deadline
+
+        self.tasks = [TraceTask(task_id, phase, period, cost, relative_deadline)
+                      for task_id, (phase, _, period, cost, relative_deadline) in sorted(summaries.items())]
+        self.total_cost = total_cost
+        self.final_time = final_time
+        if len(self.tasks) > 0:
+            self.first_release = min(task.phase for task in self.tasks)
+        self._tasks_by_id = {task.id: task for task in self.tasks}
+
+    def _records(self):
+        return _RECORD.iter_unpack(memoryview(self.map)[len(_MAGIC):])
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def utilization(self):
+        """
+        Returns the total execution cost of the trace divided by the time between its first release and last
+        deadline. All jobs must execute in that window, so the trace is unschedulable if this exceeds the capacity
+        of the processors.
+        """
+        if self.final_time == self.first_release:
+            return 0
+        return self.total_cost / (self.final_time - self.first_release)
+
+    def density(self):
+        return sum(task.density() for task in self.tasks)
+
+    def jobs(self, final_time=None):
+        """Lazily create the jobs released by :final_time: (defaults to the last deadline) in order of release"""
+        if final_time is None:
+            final_time = self.final_time
+        tasks_by_id = self._tasks_by_id
+        for release, cost, deadline, task_id in self._records():
+            if release > final_time:
+                return
+            yield Job(release=release, cost=cost, deadline=deadline, task=tasks_by_id[task_id])
+
+    def __str__(self):
+        return f"Job trace with {self.num_jobs} jobs of {len(self.tasks)} tasks until {self.final_time}" + \
+               "".join(f"\n  {task}" for task in self.tasks)
@@ -5,6 +5,15 @@ from task_systems import PeriodicTask
 This module contains priority functions for real time schedule.
 
 Each function takes a job :job: and time :t: as parameters and returns the associated priority.
+
+Priority functions may also provide a next_priority_change(job, waiting_jobs, t, processor) attribute, which returns
+the earliest time after :t: at which any of :waiting_jobs: may gain strictly higher priority than :job: if :job:
+continues executing on :processor: from time :t: (and no other job is released). Returning an earlier time is always
+safe. Schedulers use it to advance many time units at once instead of making a scheduling decision every time unit.
+Predictions are exact when execution is exact, i.e. in fixed-point mode or without cache warmup.
+
+Priority functions may also provide a scheduling_class attribute ("EDF" or "fixed priority" for priorities that only
+depend on the task), which lets the schedulers default to a tighter feasibility horizon (see feasibility_horizons).
 """
 
 
@@ -40,6 +49,38 @@ def _LLF(job, t):
     return job.deadline - t - job.remaining_cost
 
 
+def _never_changes(job, waiting_jobs, t, processor):
+    """Priorities whose order does not depend on time or execution never change relative to each other"""
+    return inf
+
+
+def _LLF_next_priority_change(job, waiting_jobs, t, processor):
+    """
+    The laxity of a waiting job decreases by 1 per time unit, while the laxity of the executing job decreases by 1 less
+    the work it completes. A waiting job therefore gains priority as soon as the executing job has completed more work
+    than the difference between their laxities.
+    """
+    if len(waiting_jobs) == 0:
+        return inf
+
+    # laxity differences in units of remaining work (scaled integers in fixed-point mode)
+    laxity_difference = min((waiting_job.deadline - job.deadline) * job.scale - waiting_job.remaining_work
+                            for waiting_job in waiting_jobs) + job.remaining_work
+    return t + max(1, processor.completion_time(laxity_difference + 1, job.remaining_overhead))
+
+
+_RM.next_priority_change = _never_changes
+_DM.next_priority_change = _never_changes
+_static.next_priority_change = _never_changes
+_EDF.next_priority_change = _never_changes  # all deadlines approach at the same rate
+_LLF.next_priority_change = _LLF_next_priority_change
+
+_RM.scheduling_class = "fixed priority"
+_DM.scheduling_class = "fixed priority"
+_static.scheduling_class = "fixed priority"
+_EDF.scheduling_class = "EDF"
+
+
 def handle_overhead(priority_function):
     """Augment a priority function by executing overhead nonpreemptively before any non-overhead execution cost"""
 
@@ -48,6 +89,17 @@ def handle_overhead(priority_function):
             return -inf
         return priority_function(job, t)
 
+    def next_priority_change(job, waiting_jobs, t, processor):
+        next_change = priority_function.next_priority_change(job, waiting_jobs, t, processor)
+        if job.remaining_overhead > 0:
+            # waiting jobs can only preempt the job once its overhead completes
+            next_change = min(next_change, t + job.remaining_overhead)
+        return next_change
+
+    if hasattr(priority_function, "next_priority_change"):
+        overhead_variant.next_priority_change = next_priority_change
+    if hasattr(priority_function, "scheduling_class"):
+        overhead_variant.scheduling_class = priority_function.scheduling_class  # overhead is zero on ideal processors
     return overhead_variant
 
 
@@ -59,6 +111,18 @@ def make_nonpreemptive(priority_function):
             return -inf
         return priority_function(job, t)
 
+    def next_priority_change(job, waiting_jobs, t, processor):
+        if job.remaining_cost < job.cost:
+            return inf
+
+        # the job can only be preempted until it completes work, i.e. up to the time its overhead completes
+        next_change = priority_function.next_priority_change(job, waiting_jobs, t, processor)
+        if next_change <= t + job.remaining_overhead:
+            return next_change
+        return inf
+
+    if hasattr(priority_function, "next_priority_change"):
+        nonpreemptive_variant.next_priority_change = next_priority_change
     return nonpreemptive_variant
 
 
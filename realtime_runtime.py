@@ -0,0 +1,273 @@
+import asyncio
+from math import floor, inf
+from task_scheduling import Processor, _has_higher_priority
+from task_systems import iterate_released_jobs
+from time import perf_counter
+
+"""
+This module runs a uniprocessor scheduler in wall-clock time with asyncio instead of in simulated time.
+
+Jobs are admitted when their release time arrives on the wall clock, either paced from periodic tasks or as they are
+produced by an external asynchronous source. Every release and completion triggers a scheduling decision by the same
+priority functions the simulators use, and execution between decisions follows the Processor overhead and cache
+model. The runtime records how long each decision takes, how far decisions lag behind the wall-clock time they were
+due at, and the lateness of every job, which shows whether dispatching keeps up with a given release rate.
+"""
+
+
+class LatencyHistogram:
+    """Histogram of durations in power-of-two nanosecond buckets"""
+
+    def __init__(self):
+        self.buckets = {}  # k -> number of durations in [2^(k-1), 2^k) nanoseconds (k = 0 for durations < 1 ns)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        nanoseconds = int(seconds * 1e9)
+        bucket = nanoseconds.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def mean(self):
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def percentile(self, p):
+        """Returns an upper bound in seconds on the :p:-th percentile (0 < p <= 100), accurate to a factor of 2"""
+        threshold = p / 100 * self.count
+        cumulative = 0
+        for bucket in sorted(self.buckets):
+            cumulative += self.buckets[bucket]
+            if cumulative >= threshold:
+                return min(self.max, 2 ** bucket / 1e9)
+        return self.max
+
+    def __str__(self):
+        return f"{self.count} samples: mean {1e6 * self.mean():.2f} us, p50 <= {1e6 * self.percentile(50):.2f} us, " \
+               f"p99 <= {1e6 * self.percentile(99):.2f} us, max {1e6 * self.max:.2f} us"
+
+
+class RuntimeStatistics:
+    """Measurements of a wall-clock run"""
+
+    def __init__(self):
+        self.decision_latency = LatencyHistogram()  # time to make each scheduling decision
+        self.dispatch_lag = LatencyHistogram()  # delay between when each decision was due and when it was made
+        self.num_decisions = 0
+        self.num_completed = 0
+        self.num_late = 0  # completed after their deadline
+        self.max_lateness = -inf  # in time units
+
+    def __str__(self):
+        return f"{self.num_decisions} decisions, {self.num_completed} jobs completed ({self.num_late} late, max " \
+               f"lateness {self.max_lateness})\n  decision latency: {self.decision_latency}\n  dispatch lag: " \
+               f"{self.dispatch_lag}"
+
+
+class RealTimeDispatcher:
+    """Entity that dispatches jobs on a single processor as they are released in wall-clock time"""
+
+    def __init__(self, priority_function, processor=None, time_unit=1e-6):
+        """
+        :param priority_function: job priority function to use
+        :param processor: processor whose overhead and cache model execution follows. Defaults to a zero overhead CPU
+        :param time_unit: seconds per time unit of release times, costs and deadlines
+        """
+        self.priority_function = priority_function
+        self.CPU = Processor() if processor is None else processor
+        self.time_unit = time_unit
+
+    async def run(self, releases, final_time=None, sink=None):
+        """
+        Dispatch jobs as their releases arrive until all jobs completed or the final time has passed.
+
+        :param releases: iterable of jobs in order of release (e.g. periodic_releases), which are released once the
+                         wall clock reaches their release times, or asynchronous iterable of jobs (e.g. an external
+                         source), which are released as they arrive
+        :param final_time: optional time to stop at
+        :param sink: optional sink that receives scheduled intervals as they close
+        :return: schedule (only the last interval if a sink is provided) and RuntimeStatistics
+        """
+        run = _Run(self, final_time, sink)
+        await run.execute(releases)
+        return run.CPU.schedule, run.statistics
+
+
+class _Run:
+    """State of a single run of a RealTimeDispatcher"""
+
+    def __init__(self, dispatcher, final_time, sink):
+        self.priority_function = dispatcher.priority_function
+        self.CPU = dispatcher.CPU.copy(sink=sink)
+        self.time_unit = dispatcher.time_unit
+        self.final_time = inf if final_time is None else final_time
+        self.sink = sink
+        self.statistics = RuntimeStatistics()
+        self.released_jobs = []
+        self.job_to_schedule = None
+        self.next_decision = inf  # time at which priorities may change while job_to_schedule executes
+        self.event_driven = hasattr(self.priority_function, "next_priority_change") and self.CPU.exact_advancement()
+        self.start = perf_counter()
+
+    def now(self):
+        """Returns the current wall-clock time in time units since the start of the run"""
+        return floor((perf_counter() - self.start) / self.time_unit)
+
+    def decide(self, due_time):
+        """Choose the job to execute next, as the simulators do at each time unit"""
+        decision_start = perf_counter()
+        job_to_schedule = self.CPU.last_job_scheduled()
+        for job in self.released_jobs:
+            if job_to_schedule is None or job_to_schedule.has_completed():
+                job_to_schedule = job  # CPU was idle, so choose this job
+            elif _has_higher_priority(self.priority_function(job, self.CPU.time),
+                                      self.priority_function(job_to_schedule, self.CPU.time)):
+                job_to_schedule = job
+        self.job_to_schedule = job_to_schedule
+        self.next_decision = self._next_decision(job_to_schedule)
+
+        decision_end = perf_counter()
+        self.statistics.num_decisions += 1
+        self.statistics.decision_latency.add(decision_end - decision_start)
+        self.statistics.dispatch_lag.add(max(0.0, decision_end - self.start - due_time * self.time_unit))
+
+    def _next_decision(self, job_to_schedule):
+        """
+        Returns the time of the next decision while :job_to_schedule: executes, i.e. the time the simulators decide
+        again at: after one time unit, or at the next deadline or priority change if the priority function predicts
+        its priority changes
+        """
+        CPU = self.CPU
+        if not self.event_driven or job_to_schedule is not CPU.last_job_scheduled():
+            return CPU.time + 1
+
+        waiting_jobs = [job for job in self.released_jobs if job is not job_to_schedule]
+        next_decision = min(min(job.deadline for job in self.released_jobs),
+                            self.priority_function.next_priority_change(job_to_schedule, waiting_jobs, CPU.time, CPU))
+        return max(CPU.time + 1, next_decision)
+
+    def advance(self, t):
+        """Execute the processor model up to time :t:, deciding again at every completion on the way"""
+        CPU = self.CPU
+        while CPU.time < t:
+            job = self.job_to_schedule
+            if job is None:
+                CPU.idle_until(t)
+                return
+
+            duration = min(t, self.next_decision) - CPU.time
+            duration = min(duration, CPU.time_to_completion(job))
+            CPU.schedule_job(job, duration)
+            if job.has_completed():
+                self.released_jobs.remove(job)
+                lateness = CPU.time - job.deadline
+                self.statistics.num_completed += 1
+                self.statistics.num_late += lateness > 0
+                self.statistics.max_lateness = max(self.statistics.max_lateness, lateness)
+                self.job_to_schedule = None
+                self.next_decision = inf
+                if len(self.released_jobs) > 0:
+                    self.decide(CPU.time)
+            elif CPU.time >= self.next_decision:
+                self.decide(CPU.time)
+
+    def release(self, jobs):
+        """
+        Release jobs that are due and decide once for all of them. The decision takes effect at the current wall-clock
+        time, so the executing job keeps executing for as long as dispatching lags behind the releases.
+        """
+        self.advance(min(self.now(), self.final_time))
+        for job in jobs:
+            if self.CPU.fixed_point_scale is not None:
+                job.use_fixed_point(self.CPU.fixed_point_scale)
+            self.released_jobs.append(job)
+            if self.sink is not None:
+                self.sink.job_released(job)
+        self.decide(jobs[0].release)
+
+    async def execute(self, releases):
+        if hasattr(releases, "__aiter__"):
+            await self._execute_asynchronous(releases)
+        else:
+            await self._execute_paced(iter(releases))
+        self.CPU.schedule.close_last()
+
+    def _next_event(self):
+        """Returns the next time the processor model needs a decision on its own (a completion or priority change)"""
+        if self.job_to_schedule is None:
+            return self.final_time
+        return min(self.final_time, self.next_decision,
+                   self.CPU.time + self.CPU.time_to_completion(self.job_to_schedule))
+
+    def _seconds_until(self, t):
+        """Returns the wall-clock time in seconds until time :t: or None if :t: is infinite"""
+        if t == inf:
+            return None
+        return max(0.0, t * self.time_unit - (perf_counter() - self.start))
+
+    async def _sleep_until(self, t):
+        if t != inf:
+            await asyncio.sleep(self._seconds_until(t))
+
+    async def _execute_paced(self, releases):
+        """Release jobs of an iterable when the wall clock reaches their release times"""
+        next_job = next(releases, None)
+        while self.CPU.time < self.final_time and (next_job is not None or self.job_to_schedule is not None):
+            now = self.now()
+            due_jobs = []
+            while next_job is not None and next_job.release <= now:
+                due_jobs.append(next_job)
+                next_job = next(releases, None)
+            if len(due_jobs) > 0:
+                self.release(due_jobs)
+            else:
+                self.advance(min(now, self.final_time))
+
+            await self._sleep_until(min(self._next_event(), inf if next_job is None else next_job.release))
+
+    async def _execute_asynchronous(self, releases):
+        """Release jobs of an asynchronous iterable as soon as they arrive"""
+        arrived = []
+        arrival = asyncio.Event()
+        exhausted = False
+
+        async def receive():
+            nonlocal exhausted
+            try:
+                async for job in releases:
+                    arrived.append(job)
+                    arrival.set()
+            finally:
+                exhausted = True
+                arrival.set()
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while self.CPU.time < self.final_time and not (exhausted and len(arrived) == 0 and
+                                                           self.job_to_schedule is None):
+                if len(arrived) > 0:
+                    due_jobs = arrived[:]
+                    arrived.clear()
+                    self.release(due_jobs)
+                else:
+                    self.advance(min(self.now(), self.final_time))
+
+                next_event = self._next_event()
+                if len(arrived) == 0 and not exhausted:
+                    arrival.clear()
+                    try:
+                        await asyncio.wait_for(arrival.wait(), self._seconds_until(next_event))
+                    except asyncio.TimeoutError:
+                        pass
+                elif len(arrived) == 0:
+                    await self._sleep_until(next_event)
+        finally:
+            receiver.cancel()
+
+
+def periodic_releases(task_system, final_time):
+    """Returns the jobs of a task system released by :final_time: in order of release, as input to run()"""
+    return iterate_released_jobs(task_system.tasks, final_time)
@@ -0,0 +1,114 @@
+import numpy as np
+from schedule_sinks import NO_DEADLINE, AnalyticsSink
+
+"""
+This module computes metrics of generated schedules with array operations instead of walking scheduled jobs in Python.
+
+Schedules are first converted to columns (one entry per scheduled interval) by an AnalyticsSink, either streamed from
+a scheduler by passing the sink to generate_schedule or added from completed schedules afterwards.
+"""
+
+
+def _column(values, dtype):
+    """Copy an array.array column, so that the sink it belongs to can keep growing"""
+    return np.frombuffer(values, dtype=dtype).copy()
+
+
+class ScheduleAnalytics:
+    """Bulk metrics of a uniprocessor or multiprocessor schedule"""
+
+    def __init__(self, source, end_time=None, num_processors=None):
+        """
+        :param source: AnalyticsSink that received the schedule, or a schedule or list of schedules (one per processor)
+        :param end_time: time the schedule covers, e.g. the final time of the simulation. Defaults to the end of the
+                         last scheduled interval
+        :param num_processors: number of processors. Defaults to the number of schedules or, for a sink, the number
+                               of processors up to the last one that executed a job
+        """
+        if not isinstance(source, AnalyticsSink):
+            sink = AnalyticsSink()
+            sink.add_schedules(source)
+            source = sink
+
+        self.tasks = source.tasks
+        self.num_processors = source.num_processors if num_processors is None else num_processors
+        self.processor = _column(source.processor, np.int64)
+        self.start = _column(source.start, np.int64)
+        self.end = _column(source.end, np.int64)
+        self.overhead = _column(source.overhead, np.int64)
+        self.completed = _column(source.completed, np.int8).astype(bool)
+        self.task = _column(source.task, np.int64)
+        self.job = _column(source.job, np.int64)
+        self.release = _column(source.release, np.int64)
+        self.deadline = _column(source.deadline, np.int64)
+        self.has_deadline = self.deadline != NO_DEADLINE  # jobs of tasks with infinite relative deadlines have none
+
+        if end_time is None:
+            end_time = int(self.end.max()) if len(self.end) > 0 else 0
+        self.end_time = end_time
+
+        # intervals ordered by job and then start time, so that consecutive intervals of a job are adjacent
+        order = np.lexsort((self.start, self.job))
+        same_job = self.job[order][1:] == self.job[order][:-1]
+        self._resumed = order[1:][same_job]  # intervals that continue a job's execution
+        self._previous = order[:-1][same_job]  # interval of the same job preceding each of them
+
+    def _per_task(self, values, mask=None):
+        """Sum values per task, returning a dictionary from task to sum"""
+        tasks = self.task if mask is None else self.task[mask]
+        sums = np.bincount(tasks, weights=values, minlength=len(self.tasks))
+        return {task: sums[idx] for idx, task in enumerate(self.tasks)}
+
+    def response_times(self):
+        """Returns a dictionary from each task to an array of the response times of its completed jobs"""
+        task = self.task[self.completed]
+        response_time = self.end[self.completed] - self.release[self.completed]
+
+        order = np.argsort(task, kind="stable")
+        boundaries = np.searchsorted(task[order], np.arange(1, len(self.tasks)))
+        return dict(zip(self.tasks, np.split(response_time[order], boundaries)))
+
+    def max_response_times(self):
+        """Returns a dictionary from each task with a completed job to the largest response time of its jobs"""
+        return {task: int(times.max()) for task, times in self.response_times().items() if len(times) > 0}
+
+    def deadline_misses(self):
+        """Returns a dictionary from each task to the number of its jobs that completed after their deadline"""
+        late = self.completed & self.has_deadline & (self.end > self.deadline)
+        return {task: int(count) for task, count in self._per_task(None, late).items()}
+
+    def preemptions(self):
+        """Returns a dictionary from each task to the number of times its jobs resumed after being preempted"""
+        preempted = self.start[self._resumed] > self.end[self._previous]
+        resumed_task = self.task[self._resumed][preempted]
+        counts = np.bincount(resumed_task, minlength=len(self.tasks))
+        return {task: int(counts[idx]) for idx, task in enumerate(self.tasks)}
+
+    def migrations(self):
+        """Returns a dictionary from each task to the number of times its jobs continued on a different processor"""
+        migrated = self.processor[self._resumed] != self.processor[self._previous]
+        migrated_task = self.task[self._resumed][migrated]
+        counts = np.bincount(migrated_task, minlength=len(self.tasks))
+        return {task: int(counts[idx]) for idx, task in enumerate(self.tasks)}
+
+    def overhead_per_task(self):
+        """Returns a dictionary from each task to the time units of overhead its jobs executed"""
+        return {task: int(overhead) for task, overhead in self._per_task(self.overhead).items()}
+
+    def overhead_per_processor(self):
+        """Returns an array of the time units of overhead each processor executed"""
+        return np.bincount(self.processor, weights=self.overhead, minlength=self.num_processors).astype(np.int64)
+
+    def utilization(self):
+        """Returns a dictionary from each task to the fraction of time its jobs executed (including overhead)"""
+        return {task: float(execution_time) / self.end_time
+                for task, execution_time in self._per_task(self.end - self.start).items()}
+
+    def busy_time(self):
+        """Returns an array of the time units each processor executed jobs (including overhead)"""
+        return np.bincount(self.processor, weights=self.end - self.start,
+                           minlength=self.num_processors).astype(np.int64)
+
+    def idle_time(self):
+        """Returns an array of the time units each processor was idle up to the end time"""
+        return self.end_time - self.busy_time()
@@ -0,0 +1,157 @@
+from hashlib import blake2b
+import struct
+from schedule_sinks import ScheduleSink
+from task_scheduling import Schedule
+
+"""
+This module computes fingerprints of schedules to compare them without retaining or walking both in full.
+
+A fingerprint is an order-sensitive hash of the fields Schedule.__eq__ compares: the start and end time of each
+scheduled interval and the task of its job (identified by task ID, or by its parameters if it has no ID). Completion
+flags and the processor each interval executed on are optionally covered too. Fingerprints can be streamed from a
+scheduler with a FingerprintSink or computed from completed schedules, which yield the same digest. Only when two
+fingerprints differ do the schedules need to be compared in full, e.g. by first_divergence.
+"""
+
+_INTERVAL = struct.Struct("<qqB")  # start time, end time, flags
+_COMPLETED = 1
+_DIGEST_SIZE = 16
+
+
+def _task_identity(task):
+    """Returns the identity of a task that fingerprints cover, which is stable across copies (e.g. from pickle)"""
+    return str(task) if task.id is None else repr(task.id)
+
+
+class _ProcessorHasher:
+    """Streaming hash of the intervals of one processor's schedule"""
+
+    def __init__(self, completions):
+        self.completions = completions
+        self.hash = blake2b(digest_size=_DIGEST_SIZE)
+        self.task_keys = {}  # task -> encoded task identity
+        self.num_intervals = 0
+
+    def add(self, scheduled_job):
+        task = scheduled_job.job.task
+        task_key = self.task_keys.get(task)
+        if task_key is None:
+            identity = _task_identity(task)
+            task_key = self.task_keys[task] = struct.pack("<I", len(identity)) + identity.encode()
+
+        flags = _COMPLETED if self.completions and scheduled_job.job_completed else 0
+        self.hash.update(_INTERVAL.pack(scheduled_job.start_time, scheduled_job.end_time, flags))
+        self.hash.update(task_key)
+        self.num_intervals += 1
+
+
+def _combine(hashers, processors):
+    """Combine the digests of the non-empty processor schedules into a hexadecimal fingerprint"""
+    if processors:
+        digests = [struct.pack("<I", processor_idx) + hasher.hash.digest()
+                   for processor_idx, hasher in sorted(hashers.items()) if hasher.num_intervals > 0]
+    else:
+        # sorting makes the fingerprint invariant to which processor executed which sequence of intervals
+        digests = sorted(hasher.hash.digest() for hasher in hashers.values() if hasher.num_intervals > 0)
+
+    combined = blake2b(digest_size=_DIGEST_SIZE)
+    for digest in digests:
+        combined.update(digest)
+    return combined.hexdigest()
+
+
+class FingerprintSink(ScheduleSink):
+    """Sink that fingerprints a schedule as it is generated"""
+
+    def __init__(self, completions=False, processors=False):
+        """
+        :param completions: whether the fingerprint covers whether each interval completed its job
+        :param processors: whether the fingerprint covers which processor executed each interval. Otherwise, it only
+                           covers the sequence of intervals of each processor, regardless of processor index
+        """
+        self.completions = completions
+        self.processors = processors
+        self.hashers = {}  # processor index -> _ProcessorHasher
+
+    def add(self, scheduled_job, processor_idx):
+        hasher = self.hashers.get(processor_idx)
+        if hasher is None:
+            hasher = self.hashers[processor_idx] = _ProcessorHasher(self.completions)
+        hasher.add(scheduled_job)
+
+    def hexdigest(self):
+        """Returns the fingerprint of the intervals received so far"""
+        return _combine(self.hashers, self.processors)
+
+
+def schedule_fingerprint(schedules, completions=False, processors=False):
+    """
+    Fingerprint a completed schedule.
+
+    :param schedules: schedule (uniprocessor) or list of schedules (multiprocessor)
+    :param completions: whether the fingerprint covers whether each interval completed its job
+    :param processors: whether the fingerprint covers which processor executed each interval
+    :return: hexadecimal fingerprint, equal to that of a FingerprintSink with the same options that received the
+             schedule as it was generated
+    """
+    if isinstance(schedules, Schedule):
+        schedules = [schedules]
+
+    sink = FingerprintSink(completions, processors)
+    for processor_idx, schedule in enumerate(schedules):
+        for scheduled_job in schedule:
+            sink.add(scheduled_job, processor_idx)
+    return sink.hexdigest()
+
+
+class ScheduleDivergence:
+    """The first scheduled interval at which two schedules differ"""
+
+    def __init__(self, processor_idx, interval_idx, scheduled_job, other_scheduled_job):
+        """
+        :param processor_idx: index of the processor whose schedules differ
+        :param interval_idx: index of the first differing interval in that processor's schedules
+        :param scheduled_job: interval of the first schedule (None if it ended before the other)
+        :param other_scheduled_job: interval of the other schedule (None if it ended before the first)
+        """
+        self.processor_idx = processor_idx
+        self.interval_idx = interval_idx
+        self.scheduled_job = scheduled_job
+        self.other_scheduled_job = other_scheduled_job
+
+    def __str__(self):
+        return f"Processor {self.processor_idx}, interval {self.interval_idx}: {self.scheduled_job} " \
+               f"!= {self.other_scheduled_job}"
+
+
+def _intervals_equal(scheduled_job, other_scheduled_job, completions):
+    return scheduled_job.start_time == other_scheduled_job.start_time and \
+        scheduled_job.end_time == other_scheduled_job.end_time and \
+        _task_identity(scheduled_job.job.task) == _task_identity(other_scheduled_job.job.task) and \
+        (not completions or scheduled_job.job_completed == other_scheduled_job.job_completed)
+
+
+def first_divergence(schedules, other_schedules, completions=False):
+    """
+    Find the first interval at which two schedules differ, processor by processor.
+
+    :param schedules: schedule (uniprocessor) or list of schedules (multiprocessor)
+    :param other_schedules: schedule or list of schedules to compare to
+    :param completions: whether intervals must also agree on whether they completed their job
+    :return: ScheduleDivergence or None if the schedules are equal
+    """
+    if isinstance(schedules, Schedule):
+        schedules = [schedules]
+    if isinstance(other_schedules, Schedule):
+        other_schedules = [other_schedules]
+
+    for processor_idx in range(max(len(schedules), len(other_schedules))):
+        schedule = schedules[processor_idx] if processor_idx < len(schedules) else []
+        other_schedule = other_schedules[processor_idx] if processor_idx < len(other_schedules) else []
+        for interval_idx in range(max(len(schedule), len(other_schedule))):
+            scheduled_job = schedule[interval_idx] if interval_idx < len(schedule) else None
+            other_scheduled_job = other_schedule[interval_idx] if interval_idx < len(other_schedule) else None
+            if scheduled_job is None or other_scheduled_job is None or \
+                    not _intervals_equal(scheduled_job, other_scheduled_job, completions):
+                return ScheduleDivergence(processor_idx, interval_idx, scheduled_job, other_scheduled_job)
+    return None
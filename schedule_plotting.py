@@ -1,13 +1,52 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
-
-_COLORMAP = plt.get_cmap("Set1")
-_COLORS = [_COLORMAP(i) for i in range(8)]
-_OVERHEAD_COLOR = _COLORMAP(9)
-
+"""
+This module plots schedules with matplotlib.
+
+matplotlib and numpy are only imported the first time a schedule is plotted, so that simulations that import this
+module but never plot (e.g. experiment worker processes) do not pay their import cost.
+"""
+
+# names exported by "from schedule_plotting import *", which excludes the lazily imported modules below
+__all__ = ["plot_external_legend", "plot_uniprocessor_schedule", "plot_multiprocessor_schedule_per_processor",
+           "plot_multiprocessor_schedule_per_task", "plot_uniprocessor_schedule_collection",
+           "plot_multiprocessor_schedule_per_task_collection",
+           "plot_multiprocessor_schedule_per_processor_collection"]
+
+# set by _import_plotting on first use
+plt = None
+Figure = None
+patches = None
+LineCollection = None
+to_rgba = None
+np = None
+_COLORS = None
+_OVERHEAD_COLOR = None
+
+
+def _import_plotting():
+    global plt, Figure, patches, LineCollection, to_rgba, np, _COLORS, _OVERHEAD_COLOR
+
+    if plt is not None:
+        return
 
-def plot_external_legend(schedules, entity="Task", filename="legend.pdf", expand=None, fontsize=14):
+    import matplotlib.pyplot
+    import matplotlib.figure
+    import matplotlib.patches
+    import matplotlib.collections
+    import matplotlib.colors
+    import numpy
+
+    colormap = matplotlib.pyplot.get_cmap("Set1")
+    _COLORS = [colormap(i) for i in range(8)]
+    _OVERHEAD_COLOR = colormap(9)
+    Figure = matplotlib.figure.Figure
+    patches = matplotlib.patches
+    LineCollection = matplotlib.collections.LineCollection
+    to_rgba = matplotlib.colors.to_rgba
+    np = numpy
+    plt = matplotlib.pyplot  # assigned last, since it marks the import as done
+
+
+def plot_external_legend(schedules, entity="Task", filename="legend.pdf", expand=None, fontsize=14, ax=None):
     """
     Export a legend for a multiprocessor schedule plot.
 
@@ -16,11 +55,14 @@ def plot_external_legend(schedules, entity="Task", filename="legend.pdf", expand
     :param filename: filename to save plot to
     :param expand: amount by which to expand plot borders. Defaults to [-5, -5, 5, 5]
     :param fontsize: font size in plot
+    :param ax: axes to draw the legend on instead of saving it to :filename:. The axes are hidden and their figure
+               is resized to the legend's borders
     """
+    _import_plotting()
     if expand is None:
         expand = [-5, -5, 5, 5]
 
-    fig = plt.figure()
+    fig = Figure() if ax is None else ax.figure
 
     if entity == "Processor":
         num_entities = len(schedules) - 1
@@ -34,7 +76,7 @@ def plot_external_legend(schedules, entity="Task", filename="legend.pdf", expand
                                  linewidth=2, edgecolor='black',
                                  facecolor=_COLORS[task_id % len(_COLORS)],
                                  label=f"{entity} {task_id}")
-        fig.gca().add_patch(rect)
+        (fig.gca() if ax is None else ax).add_patch(rect)
 
     legend = fig.legend(loc="center", framealpha=1, frameon=True, fontsize=fontsize)
     legend_fig = legend.figure
@@ -42,15 +84,18 @@ def plot_external_legend(schedules, entity="Task", filename="legend.pdf", expand
     bbox = legend.get_window_extent()
     bbox = bbox.from_extents(*(bbox.extents + np.array(expand)))
     bbox = bbox.transformed(legend_fig.dpi_scale_trans.inverted())
-    legend_fig.savefig(filename, dpi="figure", bbox_inches=bbox)
-    plt.close(legend_fig)
+    if ax is None:
+        legend_fig.savefig(filename, dpi="figure", bbox_inches=bbox)
+    else:
+        ax.set_axis_off()
+        legend_fig.set_size_inches(bbox.width, bbox.height)  # the centered legend fills the resized figure
 
 
 def plot_uniprocessor_schedule(schedule, job_height=0.75,
                                arrowhead_width=None, arrowhead_height=0.2,
                                arrow_width=0.25, arrow_height=0.85,
                                T_height=0.85, T_width=None, T_linewidth=4,
-                               fontsize=14):
+                               fontsize=14, ax=None):
     """
     Plot a uniprocessor schedule with one row in the plot per task.
 
@@ -64,12 +109,17 @@ def plot_uniprocessor_schedule(schedule, job_height=0.75,
     :param T_width: width of job completion markers. Defaults to 0.5 * (last_deadline / 25)
     :param T_linewidth: linewidth of job completion markers and horizontal row lines
     :param fontsize: font size in plot
+    :param ax: axes to draw on. Defaults to the current axes
+    :return: the axes drawn on
     """
+    _import_plotting()
+    if ax is None:
+        ax = plt.gca()
 
     all_jobs = {scheduled_job.job for scheduled_job in schedule}
 
     if len(all_jobs) == 0:
-        return
+        return ax
 
     if any(job.task.id is None for job in all_jobs):
         raise ValueError("All tasks must have integer IDs for plotting!")
@@ -79,9 +129,9 @@ def plot_uniprocessor_schedule(schedule, job_height=0.75,
     last_deadline = max(job.deadline for job in all_jobs)
 
     # Try to force matplotlib to choose reasonable window limits
-    plt.plot([0, last_deadline],
-             [min(vertical_offset.values()), max(vertical_offset.values()) + arrow_height], linewidth=0,
-             color="white")
+    ax.plot([0, last_deadline],
+            [min(vertical_offset.values()), max(vertical_offset.values()) + arrow_height], linewidth=0,
+            color="white")
 
     if T_width is None:
         T_width = 0.5 * (last_deadline / 25)
@@ -91,21 +141,21 @@ def plot_uniprocessor_schedule(schedule, job_height=0.75,
 
     # Plot horizontal row lines
     for job in all_jobs:
-        plt.hlines(vertical_offset[job], 0, last_deadline, linewidth=T_linewidth)
+        ax.hlines(vertical_offset[job], 0, last_deadline, linewidth=T_linewidth)
 
     # Plot job releases
     for job in all_jobs:
-        plt.arrow(job.release, vertical_offset[job], 0, arrow_height,
-                  head_width=arrowhead_width, head_length=arrowhead_height,
-                  length_includes_head=True, width=arrow_width, linewidth=2,
-                  facecolor="blue")
+        ax.arrow(job.release, vertical_offset[job], 0, arrow_height,
+                 head_width=arrowhead_width, head_length=arrowhead_height,
+                 length_includes_head=True, width=arrow_width, linewidth=2,
+                 facecolor="blue")
 
     # Plot job deadlines
     for job in all_jobs:
-        plt.arrow(job.deadline, vertical_offset[job] + arrow_height, 0, -arrow_height,
-                  head_width=arrowhead_width, head_length=arrowhead_height,
-                  length_includes_head=True, width=arrow_width, linewidth=2,
-                  facecolor="red")
+        ax.arrow(job.deadline, vertical_offset[job] + arrow_height, 0, -arrow_height,
+                 head_width=arrowhead_width, head_length=arrowhead_height,
+                 length_includes_head=True, width=arrow_width, linewidth=2,
+                 facecolor="red")
 
     # Plot scheduled jobs
     for scheduled_job in schedule:
@@ -117,35 +167,36 @@ def plot_uniprocessor_schedule(schedule, job_height=0.75,
         rect = patches.Rectangle((start, vertical_offset[job]), end - start, job_height,
                                  linewidth=2, edgecolor='black',
                                  facecolor=_COLORS[task_id % len(_COLORS)])
-        plt.gca().add_patch(rect)
+        ax.add_patch(rect)
 
     # Plot job completions
     for scheduled_job in schedule:
         if scheduled_job.job_completed:
             end = scheduled_job.end_time
             job = scheduled_job.job
-            plt.plot([end, end], [vertical_offset[job], vertical_offset[job] + T_height],
-                     linewidth=T_linewidth, color="black")
-            plt.plot([end - T_width, end + T_width], [vertical_offset[job] + T_height, vertical_offset[job] + T_height],
-                     linewidth=T_linewidth, color="black")
+            ax.plot([end, end], [vertical_offset[job], vertical_offset[job] + T_height],
+                    linewidth=T_linewidth, color="black")
+            ax.plot([end - T_width, end + T_width], [vertical_offset[job] + T_height, vertical_offset[job] + T_height],
+                    linewidth=T_linewidth, color="black")
 
-    plt.xlabel("time", fontsize=fontsize)
-    plt.ylabel("task id", fontsize=fontsize)
-    plt.xticks(fontsize=fontsize)
-    plt.yticks(range(0, largest_task_id + 1), fontsize=fontsize)
+    ax.set_xlabel("time", fontsize=fontsize)
+    ax.set_ylabel("task id", fontsize=fontsize)
+    ax.tick_params(labelsize=fontsize)
+    ax.set_yticks(range(0, largest_task_id + 1))
 
     # Extend x tick marks upward
-    old_xlim = plt.xlim()
-    old_ylim = plt.ylim()
-    xticks = [x for x in plt.xticks()[0] if x >= 0 and x <= last_deadline]
-    plt.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
-    plt.xlim(*old_xlim)
-    plt.ylim(*old_ylim)
+    old_xlim = ax.get_xlim()
+    old_ylim = ax.get_ylim()
+    xticks = [x for x in ax.get_xticks() if x >= 0 and x <= last_deadline]
+    ax.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
+    ax.set_xlim(*old_xlim)
+    ax.set_ylim(*old_ylim)
+    return ax
 
 
 def plot_multiprocessor_schedule_per_processor(schedules, job_height=0.75,
                                                T_linewidth=4,
-                                               fontsize=14):
+                                               fontsize=14, ax=None):
     """
     Plot a multiprocessor schedule with one row in the plot per processor.
 
@@ -153,24 +204,29 @@ def plot_multiprocessor_schedule_per_processor(schedules, job_height=0.75,
     :param job_height: height of each job in the plot
     :param T_linewidth: linewidth of horizontal row lines
     :param fontsize: font size in plot
+    :param ax: axes to draw on. Defaults to the current axes
+    :return: the axes drawn on
     """
+    _import_plotting()
+    if ax is None:
+        ax = plt.gca()
     all_jobs = {scheduled_job.job for schedule in schedules for scheduled_job in schedule}
 
     if len(all_jobs) == 0:
-        return
+        return ax
 
     last_deadline = max(job.deadline for job in all_jobs)
     vertical_offsets = {processor_idx: processor_idx - job_height / 2 for processor_idx in range(len(schedules))}
 
     # Try to force matplotlib to choose reasonable window limits
-    plt.plot([0, last_deadline], [min(vertical_offsets.values()), max(vertical_offsets.values()) + job_height],
-             linewidth=0, color="white")
+    ax.plot([0, last_deadline], [min(vertical_offsets.values()), max(vertical_offsets.values()) + job_height],
+            linewidth=0, color="white")
 
     for processor_idx, schedule in enumerate(schedules):
         vertical_offset = vertical_offsets[processor_idx]
 
         # Plot horizontal row lines
-        plt.hlines(vertical_offset, 0, last_deadline, linewidth=T_linewidth)
+        ax.hlines(vertical_offset, 0, last_deadline, linewidth=T_linewidth)
 
         # Plot scheduled jobs
         for scheduled_job in schedule:
@@ -182,27 +238,28 @@ def plot_multiprocessor_schedule_per_processor(schedules, job_height=0.75,
             rect = patches.Rectangle((start, vertical_offset), end - start, job_height,
                                      linewidth=2, edgecolor='black',
                                      facecolor=_COLORS[task_id % len(_COLORS)])
-            plt.gca().add_patch(rect)
+            ax.add_patch(rect)
 
-    plt.xlabel("time", fontsize=fontsize)
-    plt.ylabel("processor id", fontsize=fontsize)
-    plt.xticks(fontsize=fontsize)
-    plt.yticks(range(0, len(schedules)), fontsize=fontsize)
+    ax.set_xlabel("time", fontsize=fontsize)
+    ax.set_ylabel("processor id", fontsize=fontsize)
+    ax.tick_params(labelsize=fontsize)
+    ax.set_yticks(range(0, len(schedules)))
 
     # Extend x tick marks upward
-    old_xlim = plt.xlim()
-    old_ylim = plt.ylim()
-    xticks = [x for x in plt.xticks()[0] if 0 <= x <= last_deadline]
-    plt.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
-    plt.xlim(*old_xlim)
-    plt.ylim(*old_ylim)
+    old_xlim = ax.get_xlim()
+    old_ylim = ax.get_ylim()
+    xticks = [x for x in ax.get_xticks() if 0 <= x <= last_deadline]
+    ax.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
+    ax.set_xlim(*old_xlim)
+    ax.set_ylim(*old_ylim)
+    return ax
 
 
 def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
                                           arrowhead_width=None, arrowhead_height=0.2,
                                           arrow_width=0.25, arrow_height=0.85,
                                           T_height=0.85, T_width=None, T_linewidth=4,
-                                          fontsize=14):
+                                          fontsize=14, ax=None):
     """
     Plot a multiprocessor schedule with one row in the plot per task.
 
@@ -216,7 +273,12 @@ def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
     :param T_width: width of job completion markers. Defaults to 0.5 * (last_deadline / 25)
     :param T_linewidth: linewidth of job completion markers and horizontal row lines
     :param fontsize: font size in plot
+    :param ax: axes to draw on. Defaults to the current axes
+    :return: the axes drawn on
     """
+    _import_plotting()
+    if ax is None:
+        ax = plt.gca()
 
     combined_schedule = {scheduled_job for schedule in schedules for scheduled_job in schedule}
     all_jobs = {scheduled_job.job for scheduled_job in combined_schedule}
@@ -224,7 +286,7 @@ def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
                                        for scheduled_job in schedules[processor_idx]}
 
     if len(all_jobs) == 0:
-        return
+        return ax
 
     if any(job.task.id is None for job in all_jobs):
         raise ValueError("All tasks must have integer IDs for plotting!")
@@ -234,9 +296,9 @@ def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
     last_deadline = max(job.deadline for job in all_jobs)
 
     # Try to force matplotlib to choose reasonable window limits
-    plt.plot([0, last_deadline],
-             [min(vertical_offset.values()), max(vertical_offset.values()) + arrow_height], linewidth=0,
-             color="white")
+    ax.plot([0, last_deadline],
+            [min(vertical_offset.values()), max(vertical_offset.values()) + arrow_height], linewidth=0,
+            color="white")
 
     if T_width is None:
         T_width = 0.5 * (last_deadline / 25)
@@ -246,21 +308,21 @@ def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
 
     # Plot horizontal row lines
     for job in all_jobs:
-        plt.hlines(vertical_offset[job], 0, last_deadline, linewidth=T_linewidth)
+        ax.hlines(vertical_offset[job], 0, last_deadline, linewidth=T_linewidth)
 
     # Plot job releases
     for job in all_jobs:
-        plt.arrow(job.release, vertical_offset[job], 0, arrow_height,
-                  head_width=arrowhead_width, head_length=arrowhead_height,
-                  length_includes_head=True, width=arrow_width, linewidth=2,
-                  facecolor="blue")
+        ax.arrow(job.release, vertical_offset[job], 0, arrow_height,
+                 head_width=arrowhead_width, head_length=arrowhead_height,
+                 length_includes_head=True, width=arrow_width, linewidth=2,
+                 facecolor="blue")
 
     # Plot job deadlines
     for job in all_jobs:
-        plt.arrow(job.deadline, vertical_offset[job] + arrow_height, 0, -arrow_height,
-                  head_width=arrowhead_width, head_length=arrowhead_height,
-                  length_includes_head=True, width=arrow_width, linewidth=2,
-                  facecolor="red")
+        ax.arrow(job.deadline, vertical_offset[job] + arrow_height, 0, -arrow_height,
+                 head_width=arrowhead_width, head_length=arrowhead_height,
+                 length_includes_head=True, width=arrow_width, linewidth=2,
+                 facecolor="red")
 
     # Plot scheduled jobs
     for scheduled_job in combined_schedule:
@@ -272,27 +334,264 @@ def plot_multiprocessor_schedule_per_task(schedules, job_height=0.75,
         rect = patches.Rectangle((start, vertical_offset[job]), end - start, job_height,
                                  linewidth=2, edgecolor='black',
                                  facecolor=_COLORS[processor_idx % len(_COLORS)])
-        plt.gca().add_patch(rect)
+        ax.add_patch(rect)
 
     # Plot job completions
     for scheduled_job in combined_schedule:
         if scheduled_job.job_completed:
             end = scheduled_job.end_time
             job = scheduled_job.job
-            plt.plot([end, end], [vertical_offset[job], vertical_offset[job] + T_height],
-                     linewidth=T_linewidth, color="black")
-            plt.plot([end - T_width, end + T_width], [vertical_offset[job] + T_height, vertical_offset[job] + T_height],
-                     linewidth=T_linewidth, color="black")
+            ax.plot([end, end], [vertical_offset[job], vertical_offset[job] + T_height],
+                    linewidth=T_linewidth, color="black")
+            ax.plot([end - T_width, end + T_width], [vertical_offset[job] + T_height, vertical_offset[job] + T_height],
+                    linewidth=T_linewidth, color="black")
 
-    plt.xlabel("time", fontsize=fontsize)
-    plt.ylabel("task id", fontsize=fontsize)
-    plt.xticks(fontsize=fontsize)
-    plt.yticks(range(0, largest_task_id + 1), fontsize=fontsize)
+    ax.set_xlabel("time", fontsize=fontsize)
+    ax.set_ylabel("task id", fontsize=fontsize)
+    ax.tick_params(labelsize=fontsize)
+    ax.set_yticks(range(0, largest_task_id + 1))
 
     # Extend x tick marks upward
-    old_xlim = plt.xlim()
-    old_ylim = plt.ylim()
-    xticks = [x for x in plt.xticks()[0] if x >= 0 and x <= last_deadline]
-    plt.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
-    plt.xlim(*old_xlim)
-    plt.ylim(*old_ylim)
+    old_xlim = ax.get_xlim()
+    old_ylim = ax.get_ylim()
+    xticks = [x for x in ax.get_xticks() if x >= 0 and x <= last_deadline]
+    ax.vlines(xticks, old_ylim[0], old_ylim[1], linewidth=2, linestyles="dashed", alpha=0.5)
+    ax.set_xlim(*old_xlim)
+    ax.set_ylim(*old_ylim)
+    return ax
+
+
+def _time_window(schedules, time_window):
+    """Returns the (start, end) window to draw, defaulting to the whole schedule"""
+    if time_window is not None:
+        return time_window
+    last_time = max((max(scheduled_job.job.deadline, scheduled_job.end_time)
+                     for schedule in schedules for scheduled_job in schedule), default=0)
+    return 0, last_time
+
+
+def _resolution(ax, time_window, min_pixel_width):
+    """Returns the length of time covered by :min_pixel_width: pixels of the axes"""
+    width_pixels = max(ax.get_window_extent().width, 1)
+    return min_pixel_width * (time_window[1] - time_window[0]) / width_pixels
+
+
+def _aggregate_intervals(intervals, resolution, aggregate_color):
+    """
+    Level-of-detail aggregation of sorted (start, end, color) intervals in a single row.
+
+    Neighboring intervals separated by less than :resolution: are merged whenever either of them is narrower than
+    :resolution: (i.e. they could not be distinguished on screen) or they share a color. Merged intervals of differing
+    colors are drawn with :aggregate_color:.
+    """
+    aggregated = []
+    for start, end, color in intervals:
+        if len(aggregated) > 0:
+            last_start, last_end, last_color = aggregated[-1]
+            if start - last_end < resolution and \
+                    (last_end - last_start < resolution or end - start < resolution or color == last_color):
+                merged_color = last_color if color == last_color else aggregate_color
+                aggregated[-1] = (last_start, max(last_end, end), merged_color)
+                continue
+        aggregated.append((start, end, color))
+    return aggregated
+
+
+def _thin_markers(times, resolution):
+    """Drop marker times that would be drawn within :resolution: of the previously kept marker"""
+    thinned = []
+    for t in sorted(times):
+        if len(thinned) == 0 or t - thinned[-1] >= resolution:
+            thinned.append(t)
+    return thinned
+
+
+def _plot_rows_collection(ax, rows, time_window, resolution, job_height, edgecolor, linewidth, T_linewidth):
+    """Draw each row of (start, end, color) intervals as a single broken_barh collection"""
+    aggregate_color = to_rgba(_OVERHEAD_COLOR)
+    for vertical_offset, intervals in rows.items():
+        intervals = _aggregate_intervals(sorted(intervals, key=lambda interval: interval[0]), resolution,
+                                         aggregate_color)
+        if len(intervals) > 0:
+            ax.broken_barh([(start, end - start) for start, end, _ in intervals], (vertical_offset, job_height),
+                           facecolors=[color for _, _, color in intervals], edgecolor=edgecolor,
+                           linewidth=linewidth)
+
+    ax.hlines(list(rows.keys()), time_window[0], time_window[1], linewidth=T_linewidth, color="black")
+
+
+def _plot_markers_collection(ax, jobs, vertical_offset, completions, time_window, resolution,
+                             arrow_height, T_height, T_width, T_linewidth):
+    """Draw releases, deadlines, and completions of each row as line collections with one scatter per marker type"""
+    def in_window(t):
+        return time_window[0] <= t <= time_window[1]
+
+    releases, deadlines, completion_times = {}, {}, {}
+    for job in jobs:
+        offset = vertical_offset[job]
+        if in_window(job.release):
+            releases.setdefault(offset, []).append(job.release)
+        if in_window(job.deadline):
+            deadlines.setdefault(offset, []).append(job.deadline)
+    for scheduled_job in completions:
+        if in_window(scheduled_job.end_time):
+            completion_times.setdefault(vertical_offset[scheduled_job.job], []).append(scheduled_job.end_time)
+
+    release_points = [(t, offset) for offset, times in releases.items() for t in _thin_markers(times, resolution)]
+    deadline_points = [(t, offset) for offset, times in deadlines.items() for t in _thin_markers(times, resolution)]
+    completion_points = [(t, offset) for offset, times in completion_times.items()
+                         for t in _thin_markers(times, resolution)]
+
+    if len(release_points) > 0:
+        ax.add_collection(LineCollection([[(t, y), (t, y + arrow_height)] for t, y in release_points],
+                                         colors="blue", linewidths=2))
+        ax.scatter(*zip(*[(t, y + arrow_height) for t, y in release_points]), marker="^", color="blue", zorder=3)
+    if len(deadline_points) > 0:
+        ax.add_collection(LineCollection([[(t, y), (t, y + arrow_height)] for t, y in deadline_points],
+                                         colors="red", linewidths=2))
+        ax.scatter(*zip(*deadline_points), marker="v", color="red", zorder=3)
+    if len(completion_points) > 0:
+        segments = [[(t, y), (t, y + T_height)] for t, y in completion_points] + \
+                   [[(t - T_width, y + T_height), (t + T_width, y + T_height)] for t, y in completion_points]
+        ax.add_collection(LineCollection(segments, colors="black", linewidths=T_linewidth))
+
+
+def _finish_collection_axes(ax, time_window, row_ids, ylabel, job_height, arrow_height, fontsize):
+    ax.set_xlim(*time_window)
+    ax.set_ylim(min(row_ids, default=0) - job_height, max(row_ids, default=0) + arrow_height)
+    ax.set_xlabel("time", fontsize=fontsize)
+    ax.set_ylabel(ylabel, fontsize=fontsize)
+    ax.set_yticks(row_ids)
+    ax.tick_params(labelsize=fontsize)
+    ax.grid(axis="x", linewidth=2, linestyle="dashed", alpha=0.5)
+
+
+def _plot_per_task_collection(schedules, color_by_processor, time_window, ax, job_height, arrow_height, T_height,
+                              T_width, T_linewidth, min_pixel_width, edgecolor, linewidth, fontsize):
+    if ax is None:
+        ax = plt.gca()
+
+    window = _time_window(schedules, time_window)
+    resolution = _resolution(ax, window, min_pixel_width)
+    if T_width is None:
+        T_width = 0.5 * ((window[1] - window[0]) / 25)
+
+    rows, jobs, completions = {}, set(), []
+    for processor_idx, schedule in enumerate(schedules):
+        for scheduled_job in schedule.during(*window):
+            job = scheduled_job.job
+            if job.task.id is None:
+                raise ValueError("All tasks must have integer IDs for plotting!")
+
+            color_idx = processor_idx if color_by_processor else job.task.id
+            rows.setdefault(job.task.id - job_height / 2, []).append(
+                (max(scheduled_job.start_time, window[0]), min(scheduled_job.end_time, window[1]),
+                 _COLORS[color_idx % len(_COLORS)]))
+            jobs.add(job)
+            if scheduled_job.job_completed:
+                completions.append(scheduled_job)
+
+    vertical_offset = {job: job.task.id - job_height / 2 for job in jobs}
+    _plot_rows_collection(ax, rows, window, resolution, job_height, edgecolor, linewidth, T_linewidth)
+    _plot_markers_collection(ax, jobs, vertical_offset, completions, window, resolution,
+                             arrow_height, T_height, T_width, T_linewidth)
+    _finish_collection_axes(ax, window, sorted({job.task.id for job in jobs}), "task id", job_height, arrow_height,
+                            fontsize)
+    return ax
+
+
+def plot_uniprocessor_schedule_collection(schedule, time_window=None, ax=None, job_height=0.75, arrow_height=0.85,
+                                          T_height=0.85, T_width=None, T_linewidth=4, min_pixel_width=1,
+                                          edgecolor="black", linewidth=0.5, fontsize=14):
+    """
+    Plot a uniprocessor schedule with one row in the plot per task, using one collection per row and marker type.
+
+    This scales to schedules with very many intervals, unlike plot_uniprocessor_schedule.
+
+    :param schedule: schedule to plot
+    :param time_window: (start, end) window of time to draw. Defaults to the entire schedule
+    :param ax: axes to draw on. Defaults to the current axes
+    :param job_height: height of each job in the plot
+    :param arrow_height: height of release/deadline markers
+    :param T_height: height of job completion markers
+    :param T_width: width of job completion markers. Defaults to 0.5 * (window length / 25)
+    :param T_linewidth: linewidth of job completion markers and horizontal row lines
+    :param min_pixel_width: intervals and markers closer than this many pixels are aggregated
+    :param edgecolor: edge color of scheduled intervals
+    :param linewidth: edge linewidth of scheduled intervals
+    :param fontsize: font size in plot
+    :return: the axes drawn on
+    """
+    _import_plotting()
+    return _plot_per_task_collection([schedule], False, time_window, ax, job_height, arrow_height, T_height,
+                                     T_width, T_linewidth, min_pixel_width, edgecolor, linewidth, fontsize)
+
+
+def plot_multiprocessor_schedule_per_task_collection(schedules, time_window=None, ax=None, job_height=0.75,
+                                                     arrow_height=0.85, T_height=0.85, T_width=None, T_linewidth=4,
+                                                     min_pixel_width=1, edgecolor="black", linewidth=0.5,
+                                                     fontsize=14):
+    """
+    Plot a multiprocessor schedule with one row in the plot per task, using one collection per row and marker type.
+
+    This scales to schedules with very many intervals, unlike plot_multiprocessor_schedule_per_task.
+
+    :param schedules: list of schedules to plot
+    :param time_window: (start, end) window of time to draw. Defaults to the entire schedule
+    :param ax: axes to draw on. Defaults to the current axes
+    :param job_height: height of each job in the plot
+    :param arrow_height: height of release/deadline markers
+    :param T_height: height of job completion markers
+    :param T_width: width of job completion markers. Defaults to 0.5 * (window length / 25)
+    :param T_linewidth: linewidth of job completion markers and horizontal row lines
+    :param min_pixel_width: intervals and markers closer than this many pixels are aggregated
+    :param edgecolor: edge color of scheduled intervals
+    :param linewidth: edge linewidth of scheduled intervals
+    :param fontsize: font size in plot
+    :return: the axes drawn on
+    """
+    _import_plotting()
+    return _plot_per_task_collection(schedules, True, time_window, ax, job_height, arrow_height, T_height,
+                                     T_width, T_linewidth, min_pixel_width, edgecolor, linewidth, fontsize)
+
+
+def plot_multiprocessor_schedule_per_processor_collection(schedules, time_window=None, ax=None, job_height=0.75,
+                                                          T_linewidth=4, min_pixel_width=1, edgecolor="black",
+                                                          linewidth=0.5, fontsize=14):
+    """
+    Plot a multiprocessor schedule with one row in the plot per processor, using one collection per row.
+
+    This scales to schedules with very many intervals, unlike plot_multiprocessor_schedule_per_processor.
+
+    :param schedules: list of schedules to plot
+    :param time_window: (start, end) window of time to draw. Defaults to the entire schedule
+    :param ax: axes to draw on. Defaults to the current axes
+    :param job_height: height of each job in the plot
+    :param T_linewidth: linewidth of horizontal row lines
+    :param min_pixel_width: intervals closer than this many pixels are aggregated
+    :param edgecolor: edge color of scheduled intervals
+    :param linewidth: edge linewidth of scheduled intervals
+    :param fontsize: font size in plot
+    :return: the axes drawn on
+    """
+    _import_plotting()
+    if ax is None:
+        ax = plt.gca()
+
+    window = _time_window(schedules, time_window)
+    resolution = _resolution(ax, window, min_pixel_width)
+
+    rows = {}
+    for processor_idx, schedule in enumerate(schedules):
+        intervals = rows.setdefault(processor_idx - job_height / 2, [])
+        for scheduled_job in schedule.during(*window):
+            task_id = scheduled_job.job.task.id
+            if task_id is None:
+                raise ValueError("All tasks must have integer IDs for plotting!")
+            intervals.append((max(scheduled_job.start_time, window[0]), min(scheduled_job.end_time, window[1]),
+                              _COLORS[task_id % len(_COLORS)]))
+
+    _plot_rows_collection(ax, rows, window, resolution, job_height, edgecolor, linewidth, T_linewidth)
+    _finish_collection_axes(ax, window, list(range(len(schedules))), "processor id", job_height, job_height,
+                            fontsize)
+    return ax
@@ -0,0 +1,181 @@
+from hashlib import blake2b
+import inspect
+import json
+from multiprocessing import get_context
+import os
+from schedule_fingerprints import schedule_fingerprint
+from task_scheduling import Schedule
+
+"""
+This module renders batches of schedule figures in parallel and skips figures whose inputs have not changed.
+
+A render job names a schedule source (schedules, or a function that computes them such as a simulation), a plot
+function of schedule_plotting that draws on given axes, and an output file. Jobs are rendered on forked worker
+processes with the non-interactive Agg backend, each onto its own matplotlib Figure instead of the global pyplot
+figure. Every output file is recorded in a manifest (one per output directory) along with a content hash of its
+schedule, plot function and plot arguments, and a job whose hash matches the manifest and whose output file exists is
+not rendered again.
+"""
+
+MANIFEST_FILENAME = ".render_manifest.json"
+
+
+class RenderJob:
+    """A figure to render from a schedule"""
+
+    def __init__(self, source, plot_function, filename, plot_kwargs=None, figsize=None, tight_layout=True):
+        """
+        :param source: schedule, list of schedules, or function without arguments returning either. Functions are
+                       evaluated by the worker rendering the job, so they may run the simulation and may be closures
+        :param plot_function: function of the schedule(s) drawing on the axes passed as :ax: (e.g.
+                              schedule_plotting.plot_uniprocessor_schedule)
+        :param filename: file to save the figure to, whose extension determines the format
+        :param plot_kwargs: optional dictionary of further keyword arguments of the plot function
+        :param figsize: optional (width, height) of the figure in inches. Defaults to matplotlib's default
+        :param tight_layout: whether to fit the figure's padding to its contents
+        """
+        self.source = source
+        self.plot_function = plot_function
+        self.filename = filename
+        self.plot_kwargs = {} if plot_kwargs is None else plot_kwargs
+        self.figsize = figsize
+        self.tight_layout = tight_layout
+
+    def schedules(self):
+        """Returns the schedule(s) to plot, evaluating the source if it is a function"""
+        if callable(self.source):
+            return self.source()
+        return self.source
+
+
+def _source_hash(function):
+    """Returns a hash of the source file defining a function, so that editing plotting code renders again"""
+    try:
+        with open(inspect.getsourcefile(function), "rb") as file:
+            return blake2b(file.read(), digest_size=16).hexdigest()
+    except (OSError, TypeError):
+        return ""
+
+
+def render_key(schedules, render_job):
+    """
+    Compute the content hash of a figure.
+
+    The hash covers the schedule fingerprint (with completions and processors), the release and deadline of every
+    scheduled job (which the plots mark), the plot function and the source file defining it, its keyword arguments,
+    and the figure options.
+
+    :param schedules: schedule or list of schedules to plot
+    :param render_job: RenderJob of the figure
+    :return: hexadecimal hash
+    """
+    flat_schedules = [schedules] if isinstance(schedules, Schedule) else schedules
+    key = blake2b(digest_size=16)
+    key.update(schedule_fingerprint(flat_schedules, completions=True, processors=True).encode())
+    for schedule in flat_schedules:
+        key.update(repr([(scheduled_job.job.release, scheduled_job.job.deadline)
+                         for scheduled_job in schedule]).encode())
+
+    plot_function = render_job.plot_function
+    key.update(f"{plot_function.__module__}.{plot_function.__qualname__}".encode())
+    key.update(_source_hash(plot_function).encode())
+    key.update(repr(sorted(render_job.plot_kwargs.items())).encode())
+    key.update(repr((render_job.figsize, render_job.tight_layout)).encode())
+    return key.hexdigest()
+
+
+def _manifest_path(filename):
+    return os.path.join(os.path.dirname(os.path.abspath(filename)), MANIFEST_FILENAME)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _draw(schedules, render_job):
+    """Draw a figure onto its own Figure and save it, without touching pyplot's global state"""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=render_job.figsize)
+    ax = fig.add_subplot()
+    render_job.plot_function(schedules, ax=ax, **render_job.plot_kwargs)
+    if render_job.tight_layout:
+        fig.tight_layout()
+    fig.savefig(render_job.filename)
+
+
+def _render(render_job, previous_key, force):
+    """Returns the content hash of a job and whether it was rendered"""
+    schedules = render_job.schedules()
+    key = render_key(schedules, render_job)
+    if not force and key == previous_key and os.path.exists(render_job.filename):
+        return key, False
+
+    _draw(schedules, render_job)
+    return key, True
+
+
+# Render jobs of the current batch and their previous content hashes, inherited by forked workers
+_shared_render_jobs = None
+_shared_previous_keys = None
+
+
+def _use_agg_backend():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _shared_render(job_idx_and_force):
+    job_idx, force = job_idx_and_force
+    return _render(_shared_render_jobs[job_idx], _shared_previous_keys[job_idx], force)
+
+
+def render_all(render_jobs, processes=None, force=False):
+    """
+    Render a batch of figures, skipping those whose content hash and output file are unchanged.
+
+    :param render_jobs: list of RenderJobs
+    :param processes: number of forked worker processes. Defaults to the number of CPUs. With 1, figures are
+                      rendered in this process
+    :param force: whether to render every figure regardless of the manifests
+    :return: list of whether each job was rendered (False if it was skipped)
+    """
+    global _shared_render_jobs, _shared_previous_keys
+
+    filenames = [os.path.abspath(render_job.filename) for render_job in render_jobs]
+    if len(set(filenames)) != len(filenames):
+        raise ValueError("Render jobs must write to distinct files!")
+
+    manifests = {}
+    for filename in filenames:
+        path = _manifest_path(filename)
+        if path not in manifests:
+            manifests[path] = _load_manifest(path)
+    previous_keys = [manifests[_manifest_path(filename)].get(os.path.basename(filename)) for filename in filenames]
+
+    if processes == 1:
+        results = [_render(render_job, previous_key, force)
+                   for render_job, previous_key in zip(render_jobs, previous_keys)]
+    else:
+        _shared_render_jobs = render_jobs
+        _shared_previous_keys = previous_keys
+        try:
+            with get_context("fork").Pool(processes, initializer=_use_agg_backend) as pool:
+                results = pool.map(_shared_render, [(job_idx, force) for job_idx in range(len(render_jobs))],
+                                   chunksize=1)
+        finally:
+            _shared_render_jobs = None
+            _shared_previous_keys = None
+
+    # Manifests are only written by this process, after all workers finished
+    for filename, (key, _) in zip(filenames, results):
+        manifests[_manifest_path(filename)][os.path.basename(filename)] = key
+    for path, manifest in manifests.items():
+        with open(path, "w") as file:
+            json.dump(manifest, file, indent=1, sort_keys=True)
+
+    return [rendered for _, rendered in results]
@@ -0,0 +1,296 @@
+from array import array
+import gzip
+from collections import deque
+from heapq import merge
+import json
+from math import inf
+
+"""
+This module contains sinks that receive scheduled jobs while a schedule is being generated.
+
+Each sink is passed to a scheduler's generate_schedule and receives every ScheduledJob as soon as its interval closes
+(on preemption, completion, or idling), along with the index of the processor it executed on. Closed intervals are
+not retained by the schedulers, so memory stays proportional to the number of active jobs. Sinks are also notified of
+job releases and of the deadline miss that stops a simulation.
+"""
+
+
+class ScheduleSink:
+    """Base class for entities that receive scheduled jobs as they close"""
+
+    def add(self, scheduled_job, processor_idx):
+        """
+        Receive a closed interval of execution.
+
+        :param scheduled_job: scheduled job whose interval has closed
+        :param processor_idx: index of the processor the job executed on
+        """
+        raise NotImplementedError
+
+    def job_released(self, job):
+        """Receive a job as it is released"""
+        pass
+
+    def deadline_missed(self, deadline_miss):
+        """Receive the DeadlineMiss that stopped the simulation"""
+        pass
+
+    def close(self):
+        """Release any resources held by the sink"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CompressedFileSink(ScheduleSink):
+    """Sink that writes each scheduled job as a line of a gzip-compressed text file"""
+
+    def __init__(self, filename, compresslevel=6):
+        """
+        :param filename: name of file to write to
+        :param compresslevel: gzip compression level
+        """
+        self.file = gzip.open(filename, "wt", compresslevel=compresslevel)
+
+    def add(self, scheduled_job, processor_idx):
+        job = scheduled_job.job
+        self.file.write(f"{processor_idx} {scheduled_job.start_time} {scheduled_job.end_time} {job.task.id} "
+                        f"{job.release} {job.deadline} {int(scheduled_job.job_completed)}\n")
+
+    def close(self):
+        self.file.close()
+
+
+def read_compressed_schedule(filename):
+    """
+    Read the scheduled jobs written by a CompressedFileSink.
+
+    :param filename: name of file to read from
+    :return: generator of (processor_idx, start_time, end_time, task_id, release, deadline, job_completed) tuples
+    """
+    with gzip.open(filename, "rt") as file:
+        for line in file:
+            processor_idx, start_time, end_time, task_id, release, deadline, job_completed = line.split()
+            yield (int(processor_idx), int(start_time), int(end_time), None if task_id == "None" else int(task_id),
+                   int(release), inf if deadline == "inf" else int(deadline), job_completed == "1")
+
+
+class RingBufferSink(ScheduleSink):
+    """Sink that retains only the most recently closed scheduled jobs"""
+
+    def __init__(self, size):
+        """
+        :param size: maximum number of scheduled jobs to retain
+        """
+        self.buffer = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return iter(self.buffer)
+
+    def add(self, scheduled_job, processor_idx):
+        self.buffer.append((processor_idx, scheduled_job))
+
+    def scheduled_jobs(self, processor_idx=None):
+        """Returns the retained scheduled jobs, optionally only those of a single processor"""
+        return [scheduled_job for idx, scheduled_job in self.buffer if processor_idx is None or idx == processor_idx]
+
+
+class MetricsSink(ScheduleSink):
+    """Sink that accumulates summary statistics of a schedule without retaining it"""
+
+    def __init__(self):
+        self.num_intervals = 0
+        self.num_completions = 0
+        self.num_preemptions = 0  # times a job resumed later than its previous interval ended
+        self.busy_time = {}  # per processor index
+        self.execution_time = {}  # per task
+        self.end_time = 0
+        self._interrupted = {}  # job -> end of its last interval, for jobs whose last interval did not complete them
+
+    def add(self, scheduled_job, processor_idx):
+        duration = scheduled_job.end_time - scheduled_job.start_time
+        job = scheduled_job.job
+        task = job.task
+
+        self.num_intervals += 1
+        previous_end_time = self._interrupted.pop(job, None)
+        if previous_end_time is not None and scheduled_job.start_time > previous_end_time:
+            self.num_preemptions += 1
+        if scheduled_job.job_completed:
+            self.num_completions += 1
+        else:
+            self._interrupted[job] = scheduled_job.end_time
+        self.busy_time[processor_idx] = self.busy_time.get(processor_idx, 0) + duration
+        self.execution_time[task] = self.execution_time.get(task, 0) + duration
+        self.end_time = max(self.end_time, scheduled_job.end_time)
+
+    def idle_time(self, processor_idx):
+        """Returns the idle time of a processor up to the end of the last interval received"""
+        return self.end_time - self.busy_time.get(processor_idx, 0)
+
+
+# Deadline stored by AnalyticsSink for jobs without a deadline (infinite relative deadline)
+NO_DEADLINE = -2 ** 63
+
+
+class AnalyticsSink(ScheduleSink):
+    """Sink that stores scheduled jobs as compact integer columns for schedule_analytics"""
+
+    def __init__(self):
+        self.processor = array("q")
+        self.start = array("q")
+        self.end = array("q")
+        self.overhead = array("q")
+        self.completed = array("b")
+        self.task = array("q")  # index into self.tasks
+        self.job = array("q")  # unique per job
+        self.release = array("q")
+        self.deadline = array("q")  # NO_DEADLINE for jobs without a deadline
+        self.tasks = []
+        self.num_processors = 0
+        self._task_indices = {}
+        self._job_indices = {}  # only holds jobs that have not completed
+        self._num_jobs = 0
+
+    def __len__(self):
+        return len(self.start)
+
+    def add(self, scheduled_job, processor_idx):
+        job = scheduled_job.job
+
+        task_idx = self._task_indices.get(job.task)
+        if task_idx is None:
+            task_idx = self._task_indices[job.task] = len(self.tasks)
+            self.tasks.append(job.task)
+
+        job_idx = self._job_indices.get(job)
+        if job_idx is None:
+            job_idx = self._job_indices[job] = self._num_jobs
+            self._num_jobs += 1
+        if scheduled_job.job_completed:
+            del self._job_indices[job]
+
+        self.processor.append(processor_idx)
+        self.start.append(scheduled_job.start_time)
+        self.end.append(scheduled_job.end_time)
+        self.overhead.append(scheduled_job.overhead)
+        self.completed.append(scheduled_job.job_completed)
+        self.task.append(task_idx)
+        self.job.append(job_idx)
+        self.release.append(job.release)
+        self.deadline.append(NO_DEADLINE if job.deadline == inf else job.deadline)
+        self.num_processors = max(self.num_processors, processor_idx + 1)
+
+    def add_schedules(self, schedules):
+        """
+        Add the scheduled jobs of completed schedules.
+
+        :param schedules: a schedule or list of schedules (one per processor)
+        """
+        if not isinstance(schedules, list):
+            schedules = [schedules]
+        # intervals are added in order of start time across processors, as they would be streamed, so that the
+        # intervals of a job that migrated are all added before its completing interval
+        intervals = merge(*([(scheduled_job.start_time, processor_idx, scheduled_job) for scheduled_job in schedule]
+                            for processor_idx, schedule in enumerate(schedules)), key=lambda interval: interval[:2])
+        for _, processor_idx, scheduled_job in intervals:
+            self.add(scheduled_job, processor_idx)
+        self.num_processors = max(self.num_processors, len(schedules))
+
+
+class ChromeTraceSink(ScheduleSink):
+    """
+    Sink that streams a schedule to a file in the Chrome Trace Event JSON format, which trace viewers such as Perfetto
+    UI and chrome://tracing open without loading the schedule into Python.
+
+    The trace has one track per processor, with scheduled intervals and their overhead segments nested inside them,
+    and one track per task, with its jobs' intervals and releases, deadlines, completions and deadline misses.
+    """
+
+    _PROCESSORS_PID = 0
+    _TASKS_PID = 1
+
+    def __init__(self, filename, time_scale=1):
+        """
+        :param filename: name of file to write to, which is gzip-compressed if it ends with ".gz"
+        :param time_scale: microseconds per time unit of the schedule
+        """
+        self.file = gzip.open(filename, "wt") if filename.endswith(".gz") else open(filename, "w")
+        self.time_scale = time_scale
+        self._task_tracks = {}  # task -> thread ID of its track
+        self._processor_tracks = set()
+        self.file.write("[")
+        self._first_event = True
+        self._write({"ph": "M", "pid": self._PROCESSORS_PID, "name": "process_name", "args": {"name": "Processors"}})
+        self._write({"ph": "M", "pid": self._TASKS_PID, "name": "process_name", "args": {"name": "Tasks"}})
+
+    def _write(self, event):
+        if not self._first_event:
+            self.file.write(",\n")
+        self._first_event = False
+        self.file.write(json.dumps(event, separators=(",", ":")))
+
+    def _task_track(self, task):
+        track = self._task_tracks.get(task)
+        if track is None:
+            track = self._task_tracks[task] = len(self._task_tracks)
+            self._write({"ph": "M", "pid": self._TASKS_PID, "tid": track, "name": "thread_name",
+                         "args": {"name": _task_name(task)}})
+        return track
+
+    def _processor_track(self, processor_idx):
+        if processor_idx not in self._processor_tracks:
+            self._processor_tracks.add(processor_idx)
+            self._write({"ph": "M", "pid": self._PROCESSORS_PID, "tid": processor_idx, "name": "thread_name",
+                         "args": {"name": f"Processor {processor_idx}"}})
+        return processor_idx
+
+    def _instant(self, name, job, time):
+        self._write({"ph": "i", "s": "t", "pid": self._TASKS_PID, "tid": self._task_track(job.task), "name": name,
+                     "ts": time * self.time_scale, "args": {"release": job.release, "deadline": _finite(job.deadline)}})
+
+    def add(self, scheduled_job, processor_idx):
+        job = scheduled_job.job
+        start = scheduled_job.start_time * self.time_scale
+        duration = (scheduled_job.end_time - scheduled_job.start_time) * self.time_scale
+        args = {"release": job.release, "deadline": _finite(job.deadline), "completed": scheduled_job.job_completed}
+
+        processor_track = self._processor_track(processor_idx)
+        self._write({"ph": "X", "pid": self._PROCESSORS_PID, "tid": processor_track, "name": _task_name(job.task),
+                     "ts": start, "dur": duration, "args": args})
+        if scheduled_job.overhead > 0:
+            # overhead is charged when a job is switched to, so it executes at the start of the interval
+            self._write({"ph": "X", "pid": self._PROCESSORS_PID, "tid": processor_track, "name": "overhead",
+                         "cat": "overhead", "ts": start, "dur": scheduled_job.overhead * self.time_scale})
+        self._write({"ph": "X", "pid": self._TASKS_PID, "tid": self._task_track(job.task),
+                     "name": f"Processor {processor_idx}", "ts": start, "dur": duration, "args": args})
+        if scheduled_job.job_completed:
+            self._instant("completion", job, scheduled_job.end_time)
+
+    def job_released(self, job):
+        self._instant("release", job, job.release)
+        if job.deadline != inf:
+            self._instant("deadline", job, job.deadline)
+
+    def deadline_missed(self, deadline_miss):
+        self._instant("deadline miss", deadline_miss.job, deadline_miss.time)
+
+    def close(self):
+        self.file.write("]\n")
+        self.file.close()
+
+
+def _finite(time):
+    """JSON has no infinity, so infinite times are written as null"""
+    return None if time == inf else time
+
+
+def _task_name(task):
+    return str(task) if task.id is None else f"Task {task.id}"
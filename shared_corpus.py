@@ -0,0 +1,219 @@
+from array import array
+from math import inf
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from task_systems import Job, PeriodicTask, PeriodicTaskSystem, ReleaseSchedule
+
+"""
+This module places a corpus of task systems and their release tables in shared memory as flat integer arrays.
+
+Worker processes attach to the shared memory block by name and read task systems and jobs from it without copies,
+instead of receiving pickled task systems and regenerating identical job lists in every worker. The block holds a
+header followed by int64 arrays:
+    - task offsets (num_systems + 1), followed by the phase, period, cost, relative deadline and ID of every task
+    - release table final times (num_systems) and job offsets (num_systems + 1), followed by the release, cost,
+      deadline and task index (within its task system) of every job in order of release
+Infinite periods and deadlines and missing task IDs are stored as _MISSING.
+"""
+
+_MISSING = -2 ** 63
+_HEADER_SIZE = 3  # number of task systems, tasks, and jobs
+
+
+def _encode(value):
+    if value is None or value == inf:
+        return _MISSING
+    if int(value) != value:
+        raise ValueError(f"Shared corpora require integer task parameters, not {value}!")
+    return int(value)
+
+
+def _decode(value, missing):
+    return missing if value == _MISSING else value
+
+
+class SharedReleaseSchedule:
+    """Release-ordered jobs of a task system read from shared memory, usable in place of a ReleaseSchedule"""
+
+    def __init__(self, corpus, system_idx, tasks):
+        """
+        :param corpus: SharedCorpus holding the release table
+        :param system_idx: index of the task system in the corpus
+        :param tasks: tasks of the task system, which jobs refer to by index
+        """
+        self.corpus = corpus
+        self.final_time = corpus.final_times[system_idx]
+        self.start = corpus.job_offsets[system_idx]
+        self.end = corpus.job_offsets[system_idx + 1]
+        self.tasks = tasks
+
+    def __len__(self):
+        return self.end - self.start
+
+    def jobs(self, final_time=None):
+        """Lazily create fresh jobs released by :final_time: (defaults to the release table's final time) in order"""
+        if final_time is None:
+            final_time = self.final_time
+        corpus = self.corpus
+        for idx in range(self.start, self.end):
+            release = corpus.releases[idx]
+            if release > final_time:
+                return
+            yield Job(release=release, cost=corpus.costs[idx], deadline=_decode(corpus.deadlines[idx], inf),
+                      task=self.tasks[corpus.job_tasks[idx]])
+
+
+class SharedCorpus:
+    """Task systems and release tables in a shared memory block"""
+
+    def __init__(self, name):
+        """
+        Attach to a shared corpus created by SharedCorpus.create.
+
+        :param name: name of the shared memory block
+        """
+        self.memory = SharedMemory(name=name)
+        self.owner = False
+        self._views = []
+        header = self._view(0, _HEADER_SIZE)
+        num_systems, num_tasks, num_jobs = header
+        self.num_systems = num_systems
+
+        offset = _HEADER_SIZE
+        self.task_offsets = self._view(offset, num_systems + 1)
+        offset += num_systems + 1
+        self.phases, self.periods, self.task_costs, self.relative_deadlines, self.ids = \
+            [self._view(offset + k * num_tasks, num_tasks) for k in range(5)]
+        offset += 5 * num_tasks
+        self.final_times = self._view(offset, num_systems)
+        offset += num_systems
+        self.job_offsets = self._view(offset, num_systems + 1)
+        offset += num_systems + 1
+        self.releases, self.costs, self.deadlines, self.job_tasks = \
+            [self._view(offset + k * num_jobs, num_jobs) for k in range(4)]
+
+    def _view(self, offset, length):
+        """Returns a zero-copy int64 view of part of the block"""
+        view = self.memory.buf[8 * offset:8 * (offset + length)].cast("q")
+        self._views.append(view)
+        return view
+
+    @staticmethod
+    def create(task_systems, final_times=None):
+        """
+        Copy task systems and their release tables into a new shared memory block.
+
+        :param task_systems: list of task systems
+        :param final_times: optional list of the final time of each task system's release table. Defaults to no
+                            release tables
+        :return: SharedCorpus that owns the block and unlinks it on close
+        """
+        if final_times is None:
+            final_times = [0] * len(task_systems)
+        release_schedules = [ReleaseSchedule(task_system, final_time) if final_time > 0 else None
+                             for task_system, final_time in zip(task_systems, final_times)]
+
+        task_columns = [[], [], [], [], []]
+        task_offsets = [0]
+        job_columns = [[], [], [], []]
+        job_offsets = [0]
+        for task_system, release_schedule in zip(task_systems, release_schedules):
+            for task in task_system.tasks:
+                for column, value in zip(task_columns, (task.phase, task.period, task.cost, task.relative_deadline,
+                                                        task.id)):
+                    column.append(_encode(value))
+            task_offsets.append(len(task_columns[0]))
+
+            if release_schedule is not None:
+                task_indices = {id(task): idx for idx, task in enumerate(task_system.tasks)}
+                job_columns[0].extend(release_schedule.releases)
+                job_columns[1].extend(_encode(cost) for cost in release_schedule.costs)
+                job_columns[2].extend(_encode(deadline) for deadline in release_schedule.deadlines)
+                job_columns[3].extend(task_indices[id(task)] for task in release_schedule.tasks)
+            job_offsets.append(len(job_columns[0]))
+
+        values = [len(task_systems), len(task_columns[0]), len(job_columns[0])] + task_offsets + \
+            [value for column in task_columns for value in column] + \
+            [_encode(final_time) for final_time in final_times] + job_offsets + \
+            [value for column in job_columns for value in column]
+        memory = SharedMemory(create=True, size=8 * max(1, len(values)))
+        view = memory.buf.cast("q")
+        view[:len(values)] = memoryview(array("q", values))
+        view.release()
+
+        corpus = SharedCorpus(memory.name)
+        memory.close()
+        corpus.owner = True
+        return corpus
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def __len__(self):
+        return self.num_systems
+
+    def task_system(self, system_idx):
+        """Returns the task system at an index"""
+        return PeriodicTaskSystem([
+            PeriodicTask(phase=self.phases[idx], period=_decode(self.periods[idx], inf), cost=self.task_costs[idx],
+                         relative_deadline=_decode(self.relative_deadlines[idx], inf),
+                         id=_decode(self.ids[idx], None))
+            for idx in range(self.task_offsets[system_idx], self.task_offsets[system_idx + 1])])
+
+    def release_schedule(self, system_idx, task_system):
+        """
+        Returns the release table of the task system at an index or None if the corpus has none for it.
+
+        :param task_system: the task system at the index as returned by task_system(), which the jobs belong to
+        """
+        if self.job_offsets[system_idx] == self.job_offsets[system_idx + 1] and self.final_times[system_idx] == 0:
+            return None
+        return SharedReleaseSchedule(self, system_idx, task_system.tasks)
+
+    def close(self):
+        """Detach from the block, unlinking it if this corpus created it"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Corpus attached by the current worker process and the function it maps over the corpus
+_worker_corpus = None
+_worker_function = None
+
+
+def _attach_worker(name, function):
+    global _worker_corpus, _worker_function
+    _worker_corpus = SharedCorpus(name)
+    _worker_function = function
+
+
+def _evaluate_system(system_idx):
+    task_system = _worker_corpus.task_system(system_idx)
+    return _worker_function(task_system, _worker_corpus.release_schedule(system_idx, task_system))
+
+
+def map_corpus(function, task_systems, final_times=None, processes=None):
+    """
+    Evaluate a function on every task system of a corpus shared by forked worker processes.
+
+    :param function: function of a task system and its release schedule (None without release tables) returning a
+                     picklable result. It is inherited by the workers, so it may be a closure
+    :param task_systems: list of task systems
+    :param final_times: optional list of the final time of each task system's release table
+    :param processes: number of worker processes. Defaults to the number of CPUs
+    :return: list of results in the order of :task_systems:
+    """
+    with SharedCorpus.create(task_systems, final_times) as corpus:
+        with get_context("fork").Pool(processes, initializer=_attach_worker, initargs=(corpus.name, function)) as pool:
+            return pool.map(_evaluate_system, range(len(task_systems)))
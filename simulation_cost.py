@@ -0,0 +1,76 @@
+from math import ceil, floor
+from feasibility_horizons import feasibility_horizon
+
+"""
+This module estimates the work a call to generate_schedule will do before running it.
+
+Estimates only depend on the task system and processor configuration, so they are cheap to compute even when the
+simulation itself would run for hours (e.g. for asynchronous task systems with large hyperperiods, whose default
+final time is 2 * hyperperiod + max D + max phase).
+"""
+
+
+class SimulationCostEstimate:
+    """Predicted work of simulating a task system"""
+
+    def __init__(self, final_time, num_jobs, num_ticks, num_decisions, event_driven):
+        """
+        :param final_time: time the simulation runs until (unless a deadline miss is detected earlier)
+        :param num_jobs: number of jobs released by the final time
+        :param num_ticks: number of time units simulated
+        :param num_decisions: expected number of scheduling decisions, which dominates simulation time
+        :param event_driven: whether the scheduler can advance from event to event instead of per time unit
+        """
+        self.final_time = final_time
+        self.num_jobs = num_jobs
+        self.num_ticks = num_ticks
+        self.num_decisions = num_decisions
+        self.event_driven = event_driven
+
+    def exceeds(self, budget):
+        """Returns whether the simulation is predicted to exceed the ticks of a SimulationBudget"""
+        return budget.max_ticks is not None and self.num_ticks > budget.max_ticks
+
+    def __str__(self):
+        return f"Simulation until {self.final_time}: {self.num_jobs} jobs, {self.num_ticks} ticks, " \
+               f"~{self.num_decisions} decisions"
+
+
+def num_released_jobs(task_system, final_time):
+    """Returns the number of jobs of a task system released by :final_time: (inclusive)"""
+    return sum(floor((final_time - task.phase) / task.period) + 1
+               for task in task_system.tasks if task.phase <= final_time)
+
+
+def estimate_simulation_cost(task_system, processors, priority_function=None, final_time=None):
+    """
+    Estimate the work of generating a schedule for a task system.
+
+    The scheduler makes a decision in every time unit in which any job is pending, i.e. a fraction of time about equal
+    to the utilization (including overhead charged per job) capped at 1. Event-driven simulation instead makes a
+    decision per release, completion and deadline, unless priorities change more often (e.g. for LLF).
+
+    :param task_system: task system to schedule
+    :param processors: a single processor (uniprocessor scheduling) or list of processors
+    :param priority_function: priority function to schedule with, which determines whether simulation can be
+                              event-driven. Defaults to assuming simulation per time unit
+    :param final_time: time to simulate until. Defaults to the feasibility horizon generate_schedule defaults to
+    :return: SimulationCostEstimate
+    """
+    if not isinstance(processors, list):
+        processors = [processors]
+    if final_time is None:
+        final_time = feasibility_horizon(task_system, processors, priority_function).final_time
+
+    num_jobs = num_released_jobs(task_system, final_time)
+
+    overhead_per_job = max(CPU.schedule_cost + CPU.dispatch_cost + CPU.preemption_cost for CPU in processors)
+    busy_fraction = min(1, sum((task.cost + overhead_per_job) / task.period for task in task_system.tasks))
+    num_decisions = ceil(busy_fraction * final_time)
+
+    event_driven = priority_function is not None and hasattr(priority_function, "next_priority_change") and \
+        all(CPU.exact_advancement() for CPU in processors)
+    if event_driven:
+        num_decisions = min(num_decisions, 3 * num_jobs)
+
+    return SimulationCostEstimate(final_time, num_jobs, final_time, num_decisions, event_driven)
@@ -1,20 +1,107 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import copy
+from fractions import Fraction
 import functools
-from math import inf
+from heapq import heappop, heappush
+from itertools import chain
+from math import ceil, gcd, inf, sqrt
+import os
+import sys
+from feasibility_horizons import feasibility_horizon
+from task_systems import iterate_released_jobs
+from time import monotonic
 
 _DEBUG = True
 
 
+def _has_higher_priority(priority, other_priority):
+    """
+    Returns whether :priority: is strictly higher (smaller) than :other_priority:.
+
+    Strict inequality favors continuing execution of a previous job. For floating point priorities, the addition of
+    1e-10 allows for minor handling of floating point errors from the variable execution rate. Exact (integer or
+    fixed-point) priorities are compared exactly.
+    """
+    if isinstance(priority, float) or isinstance(other_priority, float):
+        return priority + 1e-10 < other_priority
+    return priority < other_priority
+
+
+def fixed_point_scale(processors):
+    """
+    Returns the smallest scale at which all processors' cache models are exact in fixed-point arithmetic.
+
+    :param processors: processors to find a common scale for
+    :return: integer scale such that every warm cache rate and per time unit rate increase is a multiple of 1 / scale
+    """
+    scale = 1
+    for CPU in processors:
+        for value in [Fraction(CPU.warm_cache_rate)] + \
+                     ([] if CPU.cache_warmup_time is None else
+                      [(Fraction(CPU.warm_cache_rate) - 1) / Fraction(CPU.cache_warmup_time)]):
+            scale = scale * value.denominator // gcd(scale, value.denominator)
+    return scale
+
+
+def pack_state(processors, jobs):
+    """
+    Pack the mutable state of processors and jobs in fixed-point mode into an integer array.
+
+    :param processors: processors whose time and execution rate to pack
+    :param jobs: jobs whose remaining work, overhead, and started flags to pack
+    :return: array of signed 64-bit integers, which is cheap to hash (via tobytes()) and compare
+    """
+    return array("q", [value for CPU in processors for value in CPU.state()] +
+                 [value for job in jobs for value in job.state()])
+
+
+def _ceil_div(a, b):
+    """Ceiling division that is exact for integers"""
+    return int(-(-a // b))
+
+
+def default_final_time(task_system):
+    """Returns the final time required to provably show the task system is schedulable under any configuration"""
+    return feasibility_horizon(task_system).final_time
+
+
+def _final_time_and_jobs(task_system, final_time, release_schedule, processors, priority_function):
+    """
+    Returns the final time to simulate until, the name of the bound it follows from (None unless it is the
+    feasibility horizon of the configuration), and a release-ordered iterator over the jobs to schedule
+    """
+    if release_schedule is None and hasattr(task_system, "jobs"):
+        release_schedule = task_system  # task systems such as job traces provide their own jobs
+
+    if release_schedule is not None:
+        if final_time is None:
+            final_time = release_schedule.final_time
+        elif final_time > release_schedule.final_time:
+            raise ValueError(f"Release schedule only covers releases by time {release_schedule.final_time}!")
+        return final_time, None, release_schedule.jobs(final_time)
+
+    # If no final time is provided, compute the final time required to provably show the task system is schedulable
+    bound = None
+    if final_time is None:
+        horizon = feasibility_horizon(task_system, processors, priority_function)
+        final_time, bound = horizon.final_time, horizon.bound
+    return final_time, bound, iterate_released_jobs(task_system.tasks, final_time)
+
+
 class Processor:
     """Processor that can schedule jobs"""
 
     def __init__(self, schedule_cost=0, dispatch_cost=0, preemption_cost=0,
-                 cache_warmup_time=None, warm_cache_rate=1):
+                 cache_warmup_time=None, warm_cache_rate=1, fixed_point_scale=None):
         """
         :param schedule_cost: overhead to schedule a job
         :param dispatch_cost: overhead to dispatch a job
         :param preemption_cost: overhead to preempt/resume a job
         :param cache_warmup_time: time to completely warm up cache
         :param warm_cache_rate: rate of execution when cache is cold
+        :param fixed_point_scale: if provided, account for execution rates and remaining work as integer multiples
+                                  of 1 / fixed_point_scale (see fixed_point_scale()). Defaults to floating point
         """
         self.schedule = Schedule()
         self.time = 0
@@ -25,12 +112,50 @@ class Processor:
 
         self.cache_warmup_time = cache_warmup_time
         self.warm_cache_rate = warm_cache_rate
-        self.execution_rate = warm_cache_rate
+        self.fixed_point_scale = fixed_point_scale
 
-    def reset(self):
-        self.schedule = Schedule()
+        # execution rates in units of work per time unit, which are scaled integers in fixed-point mode
+        if fixed_point_scale is None:
+            self._cold_rate = 1
+            self._warm_rate = warm_cache_rate
+            self._rate_step = None if cache_warmup_time is None else (warm_cache_rate - 1) / cache_warmup_time
+        else:
+            self._cold_rate = fixed_point_scale
+            self._warm_rate = Fraction(warm_cache_rate) * fixed_point_scale
+            self._rate_step = None if cache_warmup_time is None else \
+                (self._warm_rate - fixed_point_scale) / Fraction(cache_warmup_time)
+            if self._warm_rate.denominator != 1 or (self._rate_step is not None and self._rate_step.denominator != 1):
+                raise ValueError(f"Cache model is not exact with fixed-point scale {fixed_point_scale}!")
+            self._warm_rate = int(self._warm_rate)
+            self._rate_step = None if self._rate_step is None else int(self._rate_step)
+
+        self.execution_rate = self._warm_rate
+
+    def reset(self, sink=None, processor_idx=0):
+        """
+        Clear the processor's schedule and time.
+
+        :param sink: optional sink that receives scheduled intervals as they close instead of retaining them
+        :param processor_idx: index of this processor reported to the sink
+        """
+        self.schedule = Schedule(sink=sink, processor_idx=processor_idx)
         self.time = 0
-        self.execution_rate = self.warm_cache_rate
+        self.execution_rate = self._warm_rate
+
+    def copy(self, sink=None, processor_idx=0):
+        """
+        Returns a processor with the same configuration and fresh state, so that simulations never share state.
+
+        :param sink: optional sink that receives the copy's scheduled intervals as they close
+        :param processor_idx: index of the copy reported to the sink
+        """
+        CPU = copy.copy(self)
+        CPU.reset(sink=sink, processor_idx=processor_idx)
+        return CPU
+
+    def state(self):
+        """Returns the processor's mutable state as a tuple, which consists of integers in fixed-point mode"""
+        return self.time, self.execution_rate
 
     def last_job_scheduled(self):
         """Returns the last job scheduled or None if processor was idle"""
@@ -40,46 +165,189 @@ class Processor:
                 return last_scheduled_job.job
         return None  # idle
 
-    def schedule_job(self, job):
-        """Schedule a job for one time unit"""
-        if job != self.last_job_scheduled():
-            self.execution_rate = 1  # reset cache
+    def switch_overhead(self, job):
+        """Returns the overhead charged to a job if it is scheduled next (zero if it continues executing)"""
+        if job == self.last_job_scheduled():
+            return 0
 
-            if not job.has_started():
-                job.remaining_overhead += self.schedule_cost + self.dispatch_cost
-            else:
-                job.remaining_overhead += self.dispatch_cost + self.preemption_cost  # resume new job
+        if not job.has_started():
+            overhead = self.schedule_cost + self.dispatch_cost
+        else:
+            overhead = self.dispatch_cost + self.preemption_cost  # resume new job
+
+        if self.last_job_scheduled() is not None:
+            overhead += self.preemption_cost  # preempt last job
+
+        return overhead
+
+    def exact_advancement(self):
+        """Returns whether advancing multiple time units at once is exactly equivalent to advancing them one by one"""
+        return self.fixed_point_scale is not None or self._rate_step is None or self._rate_step == 0
+
+    def rate_increase(self):
+        """Returns the per time unit increase in execution rate while the cache warms up"""
+        if self._rate_step is None:
+            return 0
+        if self.warm_cache_rate < 1:
+            raise ValueError("Closed-form cache model requires a warm cache rate of at least 1!")
+        return self._rate_step
+
+    def _ramp_duration(self, execution_rate):
+        """Returns the number of (non-overhead) time units executed before the rate saturates at the warm cache rate"""
+        increase = self.rate_increase()
+        if increase == 0 or execution_rate >= self._warm_rate:
+            return 0
+        return _ceil_div(self._warm_rate - execution_rate, increase)
+
+    def _work(self, duration, execution_rate):
+        """Returns the execution cost completed in :duration: non-overhead time units starting at :execution_rate:"""
+        increase = self.rate_increase()
+        if increase == 0:
+            return duration * execution_rate  # no cache warmup, so the rate is constant
+
+        ramp_duration = self._ramp_duration(execution_rate)
+        if duration <= ramp_duration:
+            return duration * execution_rate + increase * (duration * (duration - 1) // 2)
+        return ramp_duration * execution_rate + increase * (ramp_duration * (ramp_duration - 1) // 2) + \
+            (duration - ramp_duration) * self._warm_rate
+
+    def execution_progress(self, duration, remaining_overhead=0, execution_rate=None):
+        """
+        Closed-form progress of a dispatched job executing for :duration: time units.
 
-            if self.last_job_scheduled() is not None:
-                job.remaining_overhead += self.preemption_cost  # preempt last job
+        Overhead executes first at full speed, after which the execution rate increases linearly by rate_increase()
+        per time unit until it saturates at the warm cache rate. This matches :duration: calls to schedule_job and
+        is exact in fixed-point mode, where rates and work are scaled integers.
+
+        :param duration: number of time units to execute for
+        :param remaining_overhead: overhead the job must execute first
+        :param execution_rate: execution rate after the overhead. Defaults to the processor's current rate
+        :return: overhead executed, work completed, and execution rate afterwards
+        """
+        if execution_rate is None:
+            execution_rate = self.execution_rate
+
+        overhead = min(duration, remaining_overhead)
+        work_duration = duration - overhead
+        if work_duration == 0 or self.rate_increase() == 0:
+            final_rate = execution_rate
+        elif work_duration < self._ramp_duration(execution_rate):
+            final_rate = execution_rate + work_duration * self.rate_increase()
+        else:
+            final_rate = self._warm_rate
 
-        self.schedule.add(job, self.time, self.time + 1)
-        self.time += 1
+        return overhead, self._work(work_duration, execution_rate), final_rate
 
-        gain_cache_hit_ratio = not job.has_remaining_overhead()
-        job.decrement_remaining_cost(self.execution_rate)
+    def completion_time(self, remaining_work, remaining_overhead=0, execution_rate=None):
+        """
+        Solve for the number of time units a dispatched job needs to complete under the closed-form cache model.
 
-        if gain_cache_hit_ratio and self.cache_warmup_time is not None:
-            # linearly increase execution rate to warm cache rate by the cache warmup time
-            self.execution_rate += ((self.warm_cache_rate - 1) / self.cache_warmup_time)
-            if self.execution_rate >= self.warm_cache_rate:
-                self.execution_rate = self.warm_cache_rate
+        :param remaining_work: remaining work of the job (its remaining execution cost, scaled in fixed-point mode)
+        :param remaining_overhead: overhead the job must execute first
+        :param execution_rate: execution rate after the overhead. Defaults to the processor's current rate
+        :return: number of time units until the job completes
+        """
+        if execution_rate is None:
+            execution_rate = self.execution_rate
+        if remaining_work <= 0:
+            return remaining_overhead
+
+        increase = self.rate_increase()
+        ramp_duration = self._ramp_duration(execution_rate)
+        ramp_work = self._work(ramp_duration, execution_rate)
+
+        if increase == 0:
+            duration = _ceil_div(remaining_work, execution_rate)
+        elif remaining_work <= ramp_work:
+            # solve execution_rate * k + increase * k * (k - 1) / 2 >= remaining_work for the smallest integer k
+            b = execution_rate - increase / 2
+            duration = ceil((-b + sqrt(b * b + 2 * increase * remaining_work)) / increase)
+        else:
+            duration = ramp_duration + _ceil_div(remaining_work - ramp_work, self._warm_rate)
+
+        # correct for any rounding in the closed-form solution
+        while duration > 0 and self._work(duration - 1, execution_rate) >= remaining_work:
+            duration -= 1
+        while self._work(duration, execution_rate) < remaining_work:
+            duration += 1
+
+        return remaining_overhead + duration
+
+    def time_to_completion(self, job):
+        """Returns the number of time units a job needs to complete if it executes on this processor from now on"""
+        if job == self.last_job_scheduled():
+            execution_rate = self.execution_rate
+        else:
+            execution_rate = self._cold_rate  # cache is reset
+
+        return self.completion_time(job.remaining_work, job.remaining_overhead + self.switch_overhead(job),
+                                    execution_rate)
+
+    def schedule_job(self, job, duration=1):
+        """
+        Schedule a job for :duration: time units.
+
+        Multiple time units are advanced with the closed-form cache model and must not extend past the job's completion.
+        """
+        if job != self.last_job_scheduled():
+            job.remaining_overhead += self.switch_overhead(job)
+            self.execution_rate = self._cold_rate  # reset cache
+
+        if _DEBUG:
+            assert job.scale == (1 if self.fixed_point_scale is None else self.fixed_point_scale)
+            assert duration == 1 or duration <= self.completion_time(job.remaining_work, job.remaining_overhead)
+
+        self.schedule.add(job, self.time, self.time + duration)
+        self.time += duration
+
+        if duration == 1:
+            gain_cache_hit_ratio = not job.has_remaining_overhead()
+            if not gain_cache_hit_ratio:
+                self.schedule[-1].overhead += 1
+            job.decrement_remaining_cost(self.execution_rate)
+
+            if gain_cache_hit_ratio and self.cache_warmup_time is not None:
+                # linearly increase execution rate to warm cache rate by the cache warmup time
+                self.execution_rate += self._rate_step
+                if self.execution_rate >= self._warm_rate:
+                    self.execution_rate = self._warm_rate
+        else:
+            overhead, work, self.execution_rate = self.execution_progress(duration, job.remaining_overhead)
+            self.schedule[-1].overhead += overhead
+            job.execute(overhead, work)
 
         if job.has_completed():
             self.schedule[-1].job_completed = True
+            self.schedule.close_last()
 
     def idle_until(self, t):
         """Idle processor until specified time"""
         if _DEBUG:
             assert t >= self.time
+        if t > self.time:
+            self.schedule.close_last()
         self.time = t
 
 
 class Schedule:
-    """Sequence of scheduled jobs"""
+    """
+    Sequence of scheduled jobs.
 
-    def __init__(self):
+    Scheduled intervals are disjoint and in order of time, so queries binary search an index of their start and end
+    times, which is built on the first query after the schedule changes.
+    """
+
+    def __init__(self, sink=None, processor_idx=0):
+        """
+        :param sink: optional sink that receives each scheduled interval once it closes. When provided, closed
+                     intervals are not retained and only the most recent interval is kept in the schedule
+        :param processor_idx: index of the processor this schedule belongs to, as reported to the sink
+        """
         self.schedule = []
+        self.sink = sink
+        self.processor_idx = processor_idx
+        self._last_closed = False
+        self._index = None  # (start times, end times, task -> indices of the task's intervals)
 
     def __len__(self):
         return len(self.schedule)
@@ -106,17 +374,64 @@ class Schedule:
         """Add a job to the schedule"""
 
         if _DEBUG:
-            # With a fully general priority function, we can only schedule one time unit at a time
-            assert end_time == start_time + 1
+            assert end_time > start_time
+
+        self._index = None
 
         if len(self.schedule) > 0 and job == self.schedule[-1].job:
             if _DEBUG:
                 assert start_time == self.schedule[-1].end_time
+                assert not self._last_closed
 
             # extend the last scheduled job if this is a continued execution
             self.schedule[-1].end_time = end_time
         else:
+            self.close_last()
+            if self.sink is not None:
+                self.schedule.clear()  # closed intervals now belong to the sink
             self.schedule.append(ScheduledJob(start_time, end_time, job))
+            self._last_closed = False
+
+    def _build_index(self):
+        if self._index is None:
+            intervals_by_task = {}
+            for idx, scheduled_job in enumerate(self.schedule):
+                intervals_by_task.setdefault(scheduled_job.job.task, []).append(idx)
+            self._index = ([scheduled_job.start_time for scheduled_job in self.schedule],
+                           [scheduled_job.end_time for scheduled_job in self.schedule], intervals_by_task)
+        return self._index
+
+    def job_at(self, t):
+        """Returns the scheduled job executing at time :t: or None if the processor was idle"""
+        start_times, end_times, _ = self._build_index()
+        idx = bisect_right(start_times, t) - 1
+        if idx >= 0 and t < end_times[idx]:
+            return self.schedule[idx]
+        return None
+
+    def during(self, start_time, end_time):
+        """Returns the scheduled jobs executing at any time in [:start_time:, :end_time:) in order of time"""
+        start_times, end_times, _ = self._build_index()
+        first = bisect_right(end_times, start_time)  # first interval ending after start_time
+        last = bisect_left(start_times, end_time)  # intervals from here on start at or after end_time
+        return self.schedule[first:max(first, last)]
+
+    def last_run(self, task, t=inf):
+        """Returns the last scheduled job of :task: that started executing before time :t: or None if there is none"""
+        start_times, _, intervals_by_task = self._build_index()
+        intervals = intervals_by_task.get(task, [])
+        # interval indices increase with start times
+        idx = bisect_left(intervals, bisect_left(start_times, t)) - 1
+        if idx >= 0:
+            return self.schedule[intervals[idx]]
+        return None
+
+    def close_last(self):
+        """Close the last scheduled interval (on preemption, completion, or idling), passing it to the sink if any"""
+        if len(self.schedule) > 0 and not self._last_closed:
+            self._last_closed = True
+            if self.sink is not None:
+                self.sink.add(self.schedule[-1], self.processor_idx)
 
 
 class ScheduledJob:
@@ -127,13 +442,182 @@ class ScheduledJob:
         self.end_time = end_time
         self.job = job
         self.job_completed = False
+        self.overhead = 0  # time units of the interval spent executing overhead
 
     def __str__(self):
         return f"{str(self.job)} executing in [{self.start_time}, {self.end_time}]"
 
 
+class MultiprocessorSchedule:
+    """Queries over the schedules of several processors, answered by each schedule's index"""
+
+    def __init__(self, schedules):
+        """
+        :param schedules: list of schedules, one per processor
+        """
+        self.schedules = schedules
+
+    def jobs_at(self, t):
+        """Returns a list with the scheduled job executing on each processor at time :t: (None if idle)"""
+        return [schedule.job_at(t) for schedule in self.schedules]
+
+    def during(self, start_time, end_time):
+        """Returns (processor index, scheduled job) pairs executing at any time in [:start_time:, :end_time:)"""
+        return [(processor_idx, scheduled_job) for processor_idx, schedule in enumerate(self.schedules)
+                for scheduled_job in schedule.during(start_time, end_time)]
+
+    def last_run(self, task, t=inf):
+        """
+        Returns the (processor index, scheduled job) pair of the last interval of :task: that started executing before
+        time :t: or None if there is none
+        """
+        last = None
+        for processor_idx, schedule in enumerate(self.schedules):
+            scheduled_job = schedule.last_run(task, t)
+            if scheduled_job is not None and (last is None or scheduled_job.start_time > last[1].start_time):
+                last = (processor_idx, scheduled_job)
+        return last
+
+
+class DeadlineMiss:
+    """A job that missed its deadline"""
+
+    def __init__(self, time, job):
+        """
+        :param time: time at which the miss was detected, i.e. the job's deadline
+        :param job: job that missed its deadline
+        """
+        self.time = time
+        self.job = job
+
+    def __str__(self):
+        return f"{self.job} missed its deadline at time {self.time}"
+
+
+class SimulationResult:
+    """Outcome of generating a schedule"""
+
+    def __init__(self, schedule, schedulable, final_time, deadline_miss=None, exceeded_limit=None, horizon=None):
+        """
+        :param schedule: generated schedule (a list of schedules, one per processor, for multiprocessors)
+        :param schedulable: whether the task system is schedulable, or None if this was not decided within budget
+        :param final_time: time the schedule was generated until
+        :param deadline_miss: first deadline miss if one was detected during simulation
+        :param exceeded_limit: name of the budget limit ("wall time", "memory", or "ticks") that stopped the
+                               simulation before schedulability was decided
+        :param horizon: name of the feasibility horizon bound the final time defaulted to (None if the final time
+                        was provided or came from a release schedule)
+        """
+        self.schedule = schedule
+        self.schedulable = schedulable
+        self.final_time = final_time
+        self.deadline_miss = deadline_miss
+        self.exceeded_limit = exceeded_limit
+        self.horizon = horizon
+
+
+def _resident_memory():
+    """
+    Returns the current resident memory of this process in bytes, or its peak where the current amount is not
+    available (e.g. macOS). Returns 0 where neither is available (e.g. Windows), so memory limits are not enforced there
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import resource  # not available on Windows
+    except ImportError:
+        return 0
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_memory if sys.platform == "darwin" else 1024 * peak_memory  # reported in kilobytes on Linux
+
+
+class SimulationBudget:
+    """Limits on the resources a single simulation may use before giving up without a verdict"""
+
+    def __init__(self, max_wall_time=None, max_memory=None, max_ticks=None, check_interval=256):
+        """
+        :param max_wall_time: seconds of wall time the simulation may take
+        :param max_memory: bytes of resident memory the process may grow by during the simulation
+        :param max_ticks: time units that may be simulated
+        :param check_interval: number of scheduling decisions between checks of wall time and memory
+        """
+        self.max_wall_time = max_wall_time
+        self.max_memory = max_memory
+        self.max_ticks = max_ticks
+        self.check_interval = check_interval
+
+    def monitor(self):
+        """Returns a monitor that tracks a simulation starting now against this budget"""
+        return _BudgetMonitor(self)
+
+
+class _BudgetMonitor:
+    """Tracks the resources used by one simulation"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.start_time = monotonic()
+        # memory is measured relative to the start, so that earlier simulations in the same process do not count
+        self.start_memory = None if budget.max_memory is None else _resident_memory()
+        self.num_decisions = 0
+
+    def exceeded_limit(self, t):
+        """Returns the name of the exceeded limit, if any, once a scheduling decision has been simulated until :t:"""
+        budget = self.budget
+        if budget.max_ticks is not None and t > budget.max_ticks:
+            return "ticks"
+
+        self.num_decisions += 1
+        if self.num_decisions % budget.check_interval != 0:
+            return None  # checking wall time and memory every decision would slow down simulation
+        if budget.max_wall_time is not None and monotonic() - self.start_time > budget.max_wall_time:
+            return "wall time"
+        if budget.max_memory is not None and _resident_memory() - self.start_memory > budget.max_memory:
+            return "memory"
+        return None
+
+
+class _DeadlineIndex:
+    """Deadline-ordered index over released, incomplete jobs"""
+
+    def __init__(self):
+        self.heap = []
+        self.num_added = 0  # breaks deadline ties in order of release
+
+    def add(self, job):
+        heappush(self.heap, (job.deadline, self.num_added, job))
+        self.num_added += 1
+
+    def _discard_completed(self):
+        while len(self.heap) > 0 and self.heap[0][2].has_completed():
+            heappop(self.heap)  # completed jobs are removed lazily
+
+    def first_missed(self, t):
+        """Returns the incomplete job with the earliest deadline if it has missed its deadline by time :t:"""
+        self._discard_completed()
+        if len(self.heap) > 0 and self.heap[0][0] <= t:
+            return self.heap[0][2]  # job can no longer complete by its deadline
+        return None
+
+    def next_deadline(self):
+        """Returns the earliest deadline of any incomplete job"""
+        self._discard_completed()
+        if len(self.heap) > 0:
+            return self.heap[0][0]
+        return inf
+
+
 class UniprocessorScheduler:
-    """Entity that schedules on a single processor"""
+    """
+    Entity that schedules on a single processor.
+
+    Each simulation runs on a copy of the processor with its own jobs, so one scheduler can serve concurrent calls
+    (e.g. from a thread pool on free-threaded Python).
+    """
 
     def __init__(self, priority_function, processor=None):
         """
@@ -146,66 +630,116 @@ class UniprocessorScheduler:
         else:
             self.CPU = processor
 
-    def generate_schedule(self, task_system, final_time=None):
-        """Generate a schedule for a provided task system"""
+    def generate_schedule(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Generate a schedule for a provided task system
+
+        :param task_system: task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of the configuration
+        :param sink: optional sink that receives scheduled intervals as they close. When provided, the returned
+                     schedule only retains the last interval
+        :param release_schedule: optional precomputed ReleaseSchedule of the task system to create jobs from, which
+                                 also provides the default final time
+        :param budget: optional SimulationBudget limiting the resources used by the simulation
+        :return: schedule and whether the task system is schedulable (None if this was not decided within budget)
+        """
+        result = self.simulate(task_system, final_time, sink, release_schedule, budget)
+        return result.schedule, result.schedulable
+
+    def simulate(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Generate a schedule for a provided task system, stopping as soon as any job misses its deadline
+
+        :param task_system: task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of the configuration
+        :param sink: optional sink that receives scheduled intervals as they close. When provided, the returned
+                     schedule only retains the last interval
+        :param release_schedule: optional precomputed ReleaseSchedule of the task system to create jobs from, which
+                                 also provides the default final time
+        :param budget: optional SimulationBudget. If it is exceeded, the result is undecided (schedulable is None)
+        :return: SimulationResult with the schedule, whether the task system is schedulable, and any deadline miss
+        """
 
-        # If no final time is provided, compute the final time required to provably show the task system is schedulable
-        if final_time is None:
-            if all(task.phase == 0 for task in task_system.tasks) and \
-                    all(task.relative_deadline <= task.period for task in task_system.tasks):
-                # For synchronous task systems with relative deadlines not exceeding periods, a deadline miss must
-                # occur by the hyperperiod
-                final_time = task_system.hyperperiod
-            else:
-                # Result by Leung and Merrill: If a deadline is missed in a periodic task system with
-                # utilization <= 1, then it will be missed by time 2*P + max(D_i) + max(s_i)
-                final_time = 2 * task_system.hyperperiod + max(task.relative_deadline for task in task_system.tasks) + \
-                             max(task.phase for task in task_system.tasks)
-
-        CPU = self.CPU
-        CPU.reset()
+        final_time, horizon, remaining_jobs = _final_time_and_jobs(task_system, final_time, release_schedule, self.CPU,
+                                                                   self.priority_function)
+
+        CPU = self.CPU.copy(sink=sink)
         released_jobs = []
-        remaining_jobs = sorted([job for task in task_system.tasks
-                                 for job in task.generate_jobs(final_time)], key=lambda job: -job.release)
+        deadline_index = _DeadlineIndex()
+        next_job = next(remaining_jobs, None)
+        event_driven = hasattr(self.priority_function, "next_priority_change") and CPU.exact_advancement()
+        monitor = None if budget is None else budget.monitor()
 
         if task_system.utilization() > CPU.warm_cache_rate:
-            return CPU.schedule, False  # not schedulable
+            return SimulationResult(CPU.schedule, False, final_time, horizon=horizon)  # not schedulable
 
-        while CPU.time < final_time and len(remaining_jobs) + len(released_jobs) > 0:
+        while CPU.time < final_time and (next_job is not None or len(released_jobs) > 0):
             if len(released_jobs) != 0:
                 job_to_schedule = CPU.last_job_scheduled()
                 for job in released_jobs:
                     if job_to_schedule is None or job_to_schedule.has_completed():
                         job_to_schedule = job  # CPU was idle, so choose this job
-                    elif self.priority_function(job, CPU.time) + 1e-10 < self.priority_function(job_to_schedule,
-                                                                                                CPU.time):
-                        # strict inequality here favors continuing execution of previous job and addition of 1e-10
-                        # allows for minor handling of floating point errors from the variable execution rate
+                    elif _has_higher_priority(self.priority_function(job, CPU.time),
+                                              self.priority_function(job_to_schedule, CPU.time)):
                         job_to_schedule = job
 
-                CPU.schedule_job(job_to_schedule)
+                duration = 1
+                if event_driven and job_to_schedule == CPU.last_job_scheduled():
+                    # continue executing until the next event that could change the scheduling decision
+                    waiting_jobs = [job for job in released_jobs if job is not job_to_schedule]
+                    next_event = min(final_time, deadline_index.next_deadline(),
+                                     inf if next_job is None else next_job.release,
+                                     CPU.time + CPU.time_to_completion(job_to_schedule),
+                                     self.priority_function.next_priority_change(job_to_schedule, waiting_jobs,
+                                                                                 CPU.time, CPU))
+                    duration = max(1, next_event - CPU.time)
+
+                CPU.schedule_job(job_to_schedule, duration)
 
                 if job_to_schedule.has_completed():
                     released_jobs.remove(job_to_schedule)
 
-                if CPU.time > job_to_schedule.deadline:
-                    return CPU.schedule, False  # not schedulable
-            elif len(remaining_jobs) > 0:
+                missed_job = deadline_index.first_missed(CPU.time)
+                if missed_job is not None:
+                    CPU.schedule.close_last()
+                    deadline_miss = DeadlineMiss(CPU.time, missed_job)
+                    if sink is not None:
+                        sink.deadline_missed(deadline_miss)
+                    return SimulationResult(CPU.schedule, False, final_time, deadline_miss,
+                                            horizon=horizon)  # not schedulable
+
+                exceeded_limit = None if monitor is None else monitor.exceeded_limit(CPU.time)
+                if exceeded_limit is not None:
+                    CPU.schedule.close_last()
+                    return SimulationResult(CPU.schedule, None, final_time, exceeded_limit=exceeded_limit,
+                                            horizon=horizon)
+            elif next_job is not None:
                 # idle until next job release
-                CPU.idle_until(remaining_jobs[-1].release)
+                CPU.idle_until(next_job.release)
 
-            while len(remaining_jobs) > 0 and remaining_jobs[-1].release <= CPU.time:
-                released_jobs.append(remaining_jobs.pop())
+            while next_job is not None and next_job.release <= CPU.time:
+                if CPU.fixed_point_scale is not None:
+                    next_job.use_fixed_point(CPU.fixed_point_scale)
+                released_jobs.append(next_job)
+                deadline_index.add(next_job)
+                if sink is not None:
+                    sink.job_released(next_job)
+                next_job = next(remaining_jobs, None)
 
-        if all(job.deadline > final_time for job in remaining_jobs) and \
-                all(job.deadline > final_time for job in released_jobs):
-            return CPU.schedule, True
-        else:
-            return CPU.schedule, False
+        CPU.schedule.close_last()
+        unreleased_jobs = chain([] if next_job is None else [next_job], remaining_jobs)
+        schedulable = all(job.deadline > final_time for job in unreleased_jobs) and \
+            all(job.deadline > final_time for job in released_jobs)
+        return SimulationResult(CPU.schedule, schedulable, final_time, horizon=horizon)
 
 
 class MultiprocessorScheduler:
-    """Entity that schedules on a multiprocessor"""
+    """
+    Entity that schedules on a multiprocessor.
+
+    Each simulation runs on copies of the processors with its own jobs, so one scheduler can serve concurrent calls
+    (e.g. from a thread pool on free-threaded Python).
+    """
 
     def __init__(self, priority_function, processors, restrict_migration=False):
         """
@@ -218,6 +752,9 @@ class MultiprocessorScheduler:
         self.num_processors = len(processors)
         self.restrict_migration = restrict_migration
 
+        if len({CPU.fixed_point_scale for CPU in processors}) > 1:
+            raise ValueError("All processors must use the same fixed-point scale!")
+
     @staticmethod
     def has_idle_processors(CPUs, jobs_to_schedule):
         """Returns whether any of the CPUs are idle with the current set of jobs to schedule"""
@@ -231,33 +768,55 @@ class MultiprocessorScheduler:
                 return CPU
         return None
 
-    def generate_schedule(self, task_system, final_time=None):
-        """Generate a schedule for a provided task system"""
+    def generate_schedule(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Generate a schedule for a provided task system
+
+        :param task_system: task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of the configuration
+        :param sink: optional sink that receives scheduled intervals as they close. When provided, the returned
+                     schedules only retain their last interval
+        :param release_schedule: optional precomputed ReleaseSchedule of the task system to create jobs from, which
+                                 also provides the default final time
+        :param budget: optional SimulationBudget limiting the resources used by the simulation
+        :return: list of schedules (one per processor) and whether the task system is schedulable (None if this was
+                 not decided within budget)
+        """
+        result = self.simulate(task_system, final_time, sink, release_schedule, budget)
+        return result.schedule, result.schedulable
 
-        if final_time is None:
-            if all(task.phase == 0 for task in task_system.tasks) and \
-                    all(task.relative_deadline <= task.period for task in task_system.tasks):
-                # For synchronous task systems with relative deadlines not exceeding periods, a deadline miss must
-                # occur by the hyperperiod
-                final_time = task_system.hyperperiod
-            else:
-                # Result by Leung and Merrill: If a deadline is missed in a periodic task system with
-                # utilization <= 1, then it will be missed by time 2*P + max(D_i) + max(s_i)
-                final_time = 2 * task_system.hyperperiod + max(task.relative_deadline for task in task_system.tasks) + \
-                             max(task.phase for task in task_system.tasks)
-
-        CPUs = self.CPUs
-        for CPU in CPUs:
-            CPU.reset()
+    def simulate(self, task_system, final_time=None, sink=None, release_schedule=None, budget=None):
+        """
+        Generate a schedule for a provided task system, stopping as soon as any job misses its deadline
+
+        :param task_system: task system to schedule
+        :param final_time: time to simulate until. Defaults to the feasibility horizon of the configuration
+        :param sink: optional sink that receives scheduled intervals as they close. When provided, the returned
+                     schedules only retain their last interval
+        :param release_schedule: optional precomputed ReleaseSchedule of the task system to create jobs from, which
+                                 also provides the default final time
+        :param budget: optional SimulationBudget. If it is exceeded, the result is undecided (schedulable is None)
+        :return: SimulationResult with the list of schedules (one per processor), whether the task system is
+                 schedulable, and any deadline miss
+        """
+
+        final_time, horizon, remaining_jobs = _final_time_and_jobs(task_system, final_time, release_schedule,
+                                                                   self.CPUs, self.priority_function)
+
+        CPUs = [CPU.copy(sink=sink, processor_idx=processor_idx) for processor_idx, CPU in enumerate(self.CPUs)]
         released_jobs = []
-        remaining_jobs = sorted([job for task in task_system.tasks
-                                 for job in task.generate_jobs(final_time)], key=lambda job: -job.release)
-        migration_restriction = {job: None for job in remaining_jobs}
+        deadline_index = _DeadlineIndex()
+        next_job = next(remaining_jobs, None)
+        migration_restriction = {}  # only holds released, incomplete jobs
+        event_driven = hasattr(self.priority_function, "next_priority_change") and \
+            all(CPU.exact_advancement() for CPU in CPUs)
+        monitor = None if budget is None else budget.monitor()
 
         if task_system.utilization() > self.num_processors * max(CPU.warm_cache_rate for CPU in CPUs):
-            return [CPU.schedule for CPU in CPUs], False  # not schedulable
+            return SimulationResult([CPU.schedule for CPU in CPUs], False, final_time,
+                                    horizon=horizon)  # not schedulable
 
-        while CPUs[0].time < final_time and len(remaining_jobs) + len(released_jobs) > 0:
+        while CPUs[0].time < final_time and (next_job is not None or len(released_jobs) > 0):
             if len(released_jobs) != 0:
                 jobs_to_schedule = {CPU: CPU.last_job_scheduled() for CPU in CPUs}
 
@@ -272,10 +831,8 @@ class MultiprocessorScheduler:
                         if CPU_to_reschedule is not None:
                             current_job = jobs_to_schedule[CPU_to_reschedule]
                             if current_job is None or \
-                                    self.priority_function(job, CPUs[0].time) + 1e-10 < \
-                                    self.priority_function(current_job, CPUs[0].time):
-                                # strict inequality here favors continuing execution of previous job and the 1e-10
-                                # allows for minor handling of floating point errors from the variable execution rate
+                                    _has_higher_priority(self.priority_function(job, CPUs[0].time),
+                                                         self.priority_function(current_job, CPUs[0].time)):
                                 jobs_to_schedule[CPU_to_reschedule] = job
 
                 # Handle all jobs whose migration is not (yet) restricted
@@ -291,11 +848,9 @@ class MultiprocessorScheduler:
                         if self.has_idle_processors(CPUs, jobs_to_schedule):
                             # CPU was idle, so choose this job
                             jobs_to_schedule[self.get_idle_processor(CPUs, jobs_to_schedule)] = job
-                        elif self.priority_function(job, CPUs[0].time) + 1e-10 < \
-                                max(self.priority_function(job_to_schedule, CPUs[0].time)
-                                    for job_to_schedule in jobs_to_schedule.values()):
-                            # strict inequality here favors continuing execution of previous job and the 1e-10
-                            # allows for minor handling of floating point errors from the variable execution rate
+                        elif _has_higher_priority(self.priority_function(job, CPUs[0].time),
+                                                  max(self.priority_function(job_to_schedule, CPUs[0].time)
+                                                      for job_to_schedule in jobs_to_schedule.values())):
                             CPU_to_reschedule = max(jobs_to_schedule.items(),
                                                     key=lambda CPU_job:
                                                     self.priority_function(CPU_job[1], CPUs[0].time))[0]
@@ -306,12 +861,27 @@ class MultiprocessorScheduler:
 
                 last_time = CPUs[0].time
 
+                duration = 1
+                if event_driven and all(job is None or job == CPU.last_job_scheduled()
+                                        for CPU, job in jobs_to_schedule.items()):
+                    # continue executing until the next event that could change the scheduling decisions
+                    running_jobs = [job for job in jobs_to_schedule.values() if job is not None]
+                    waiting_jobs = [job for job in released_jobs if job not in running_jobs]
+                    next_event = min(final_time, deadline_index.next_deadline(),
+                                     inf if next_job is None else next_job.release)
+                    for CPU, job in jobs_to_schedule.items():
+                        if job is not None:
+                            next_event = min(next_event, last_time + CPU.time_to_completion(job),
+                                             self.priority_function.next_priority_change(job, waiting_jobs,
+                                                                                         last_time, CPU))
+                    duration = max(1, next_event - last_time)
+
                 for CPU, job in jobs_to_schedule.items():
                     if job is not None:
-                        CPU.schedule_job(job)
+                        CPU.schedule_job(job, duration)
 
                 for CPU in CPUs:
-                    CPU.idle_until(last_time + 1)
+                    CPU.idle_until(last_time + duration)
 
                 for CPU in CPUs:
                     job_to_schedule = CPU.last_job_scheduled()
@@ -330,24 +900,45 @@ class MultiprocessorScheduler:
 
                     if job_to_schedule is not None and job_to_schedule.has_completed():
                         released_jobs.remove(job_to_schedule)
+                        del migration_restriction[job_to_schedule]
 
                 if _DEBUG:
                     assert all(CPU.time == CPUs[0].time for CPU in CPUs)
 
-                if any(CPU.last_job_scheduled() is not None and not CPU.last_job_scheduled().has_completed() and \
-                       CPU.time > CPU.last_job_scheduled().deadline
-                       for CPU in CPUs):
-                    return [CPU.schedule for CPU in CPUs], False  # not schedulable
-            elif len(remaining_jobs) > 0:
+                missed_job = deadline_index.first_missed(CPUs[0].time)
+                if missed_job is not None:
+                    for CPU in CPUs:
+                        CPU.schedule.close_last()
+                    deadline_miss = DeadlineMiss(CPUs[0].time, missed_job)
+                    if sink is not None:
+                        sink.deadline_missed(deadline_miss)
+                    return SimulationResult([CPU.schedule for CPU in CPUs], False, final_time, deadline_miss,
+                                            horizon=horizon)  # not schedulable
+
+                exceeded_limit = None if monitor is None else monitor.exceeded_limit(CPUs[0].time)
+                if exceeded_limit is not None:
+                    for CPU in CPUs:
+                        CPU.schedule.close_last()
+                    return SimulationResult([CPU.schedule for CPU in CPUs], None, final_time,
+                                            exceeded_limit=exceeded_limit, horizon=horizon)
+            elif next_job is not None:
                 for CPU in CPUs:
                     # idle until next job release
-                    CPU.idle_until(remaining_jobs[-1].release)
+                    CPU.idle_until(next_job.release)
+
+            while next_job is not None and next_job.release <= CPUs[0].time:
+                if CPUs[0].fixed_point_scale is not None:
+                    next_job.use_fixed_point(CPUs[0].fixed_point_scale)
+                released_jobs.append(next_job)
+                deadline_index.add(next_job)
+                if sink is not None:
+                    sink.job_released(next_job)
+                migration_restriction[next_job] = None
+                next_job = next(remaining_jobs, None)
 
-            while len(remaining_jobs) > 0 and remaining_jobs[-1].release <= CPUs[0].time:
-                released_jobs.append(remaining_jobs.pop())
-
-        if all(job.deadline > final_time for job in remaining_jobs) and \
-                all(job.deadline > final_time for job in released_jobs):
-            return [CPU.schedule for CPU in CPUs], True
-        else:
-            return [CPU.schedule for CPU in CPUs], False
+        for CPU in CPUs:
+            CPU.schedule.close_last()
+        unreleased_jobs = chain([] if next_job is None else [next_job], remaining_jobs)
+        schedulable = all(job.deadline > final_time for job in unreleased_jobs) and \
+            all(job.deadline > final_time for job in released_jobs)
+        return SimulationResult([CPU.schedule for CPU in CPUs], schedulable, final_time, horizon=horizon)
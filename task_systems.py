@@ -1,4 +1,5 @@
-from functools import reduce
+from fractions import Fraction
+from heapq import merge
 from math import floor, gcd, inf
 
 _DEBUG = True
@@ -8,6 +9,48 @@ def _lcm(a, b):
     return abs(a * b) // gcd(a, b)
 
 
+def iterate_released_jobs(tasks, final_time):
+    """
+    Lazily merge the jobs released by :final_time: from several tasks in order of release.
+
+    Simultaneously released jobs are produced in reverse task order, which is the order the schedulers have always
+    considered them in. Only one pending job per task is held in memory at any time.
+    """
+    return merge(*(task.iterate_jobs(final_time) for task in reversed(tasks)), key=lambda job: job.release)
+
+
+class ReleaseSchedule:
+    """Release-ordered table of the jobs of a task system, which can be shared by many simulations of it"""
+
+    def __init__(self, task_system, final_time):
+        """
+        :param task_system: task system to build the release schedule of
+        :param final_time: time by which all jobs in the release schedule are released
+        """
+        self.final_time = final_time
+        self.releases = []
+        self.costs = []
+        self.deadlines = []
+        self.tasks = []
+        for job in iterate_released_jobs(task_system.tasks, final_time):
+            self.releases.append(job.release)
+            self.costs.append(job.cost)
+            self.deadlines.append(job.deadline)
+            self.tasks.append(job.task)
+
+    def __len__(self):
+        return len(self.releases)
+
+    def jobs(self, final_time=None):
+        """Lazily create fresh jobs released by :final_time: (defaults to the schedule's final time) in order"""
+        if final_time is None:
+            final_time = self.final_time
+        for release, cost, deadline, task in zip(self.releases, self.costs, self.deadlines, self.tasks):
+            if release > final_time:
+                return
+            yield Job(release=release, cost=cost, deadline=deadline, task=task)
+
+
 class Job:
     """A released job from a task"""
 
@@ -21,11 +64,26 @@ class Job:
         self.release = release
         self.cost = cost
         self.remaining_overhead = 0  # overhead is essentially nonpreemptive execution cost
-        self.remaining_cost = cost
+        self.scale = 1  # remaining work is accounted in units of 1 / scale of execution cost
+        self.remaining_work = cost
         self.deadline = deadline  # absolute deadline
         self.task = task
         self.started = False
 
+    @property
+    def remaining_cost(self):
+        """Remaining execution cost, which is an exact fraction in fixed-point mode"""
+        if self.scale == 1:
+            return self.remaining_work
+        return Fraction(self.remaining_work, self.scale)
+
+    def use_fixed_point(self, scale):
+        """Account for the remaining execution cost as an integer number of 1 / :scale: units"""
+        if _DEBUG:
+            assert not self.started and self.scale == 1
+        self.scale = scale
+        self.remaining_work = self.cost * scale
+
     def decrement_remaining_cost(self, execution_rate):
         """Decrease the remaining execution cost with the current cache rate, preferring to complete overhead first"""
         self.started = True
@@ -33,12 +91,18 @@ class Job:
             # overhead always executes at "full speed"
             self.remaining_overhead -= 1
         else:
-            self.remaining_cost -= execution_rate
+            self.remaining_work -= execution_rate
+
+    def execute(self, overhead, work):
+        """Decrease the remaining overhead and work after executing for multiple time units"""
+        self.started = True
+        self.remaining_overhead -= overhead
+        self.remaining_work -= work
 
     def has_started(self):
         """Returns whether the job has started execution"""
         if _DEBUG:
-            if self.remaining_cost < self.cost or self.remaining_overhead > 0:
+            if self.remaining_work < self.cost * self.scale or self.remaining_overhead > 0:
                 assert self.started
         return self.started
 
@@ -46,12 +110,16 @@ class Job:
         return self.remaining_overhead > 0
 
     def has_completed(self):
-        if self.remaining_cost <= 0:
+        if self.remaining_work <= 0:
             if _DEBUG:
                 assert self.remaining_overhead <= 0
             return True
         return False
 
+    def state(self):
+        """Returns the job's mutable state as a tuple, which consists of integers in fixed-point mode"""
+        return self.remaining_work, self.remaining_overhead, int(self.started)
+
     def __str__(self):
         return f"Job (release={self.release}, cost={self.cost}, deadline={self.deadline}) from {self.task}"
 
@@ -114,25 +182,30 @@ class PeriodicTask:
     def density(self):
         return self.cost / self.relative_deadline
 
-    def generate_jobs(self, final_time):
-        """Generate all jobs released by :final_time:"""
+    def iterate_jobs(self, final_time):
+        """Lazily generate all jobs released by :final_time: in order of release"""
 
         if self.period != inf:
             # num_releases = floor((final_time - self.phase - self.relative_deadline) / self.period) + 1
             num_releases = floor((final_time - self.phase) / self.period) + 1
-            jobs = [Job(
-                release=self.phase + k * self.period,
-                cost=self.cost,
-                deadline=self.phase + k * self.period + self.relative_deadline,
-                task=self
-            ) for k in range(num_releases)]
+            for k in range(num_releases):
+                yield Job(
+                    release=self.phase + k * self.period,
+                    cost=self.cost,
+                    deadline=self.phase + k * self.period + self.relative_deadline,
+                    task=self
+                )
         else:
-            jobs = [Job(
+            yield Job(
                 release=self.phase,
                 cost=self.cost,
                 deadline=self.phase + self.relative_deadline,
                 task=self
-            )]
+            )
+
+    def generate_jobs(self, final_time):
+        """Generate all jobs released by :final_time:"""
+        jobs = list(self.iterate_jobs(final_time))
 
         if _DEBUG:
             if len(jobs) == 0:
@@ -147,12 +220,12 @@ class PeriodicTaskSystem:
     """System of multiple periodic tasks"""
 
     def __init__(self, initial_tasks=None):
-        if initial_tasks is None:
-            self.tasks = []
-            self.hyperperiod = 0
-        else:
-            self.tasks = initial_tasks.copy()
-            self._update_hyperperiod()
+        self.tasks = []
+        self.hyperperiod = 0
+        self._utilization = 0
+        self._density = 0
+        if initial_tasks is not None:
+            self.add_tasks(initial_tasks)
 
     def __iter__(self):
         return iter(self.tasks)
@@ -161,20 +234,19 @@ class PeriodicTaskSystem:
         return len(self.tasks)
 
     def add_tasks(self, new_tasks):
-        self.tasks.extend(new_tasks)
-        self._update_hyperperiod()
+        """Add tasks, updating the hyperperiod, utilization, and density incrementally"""
+        for task in new_tasks:
+            self.tasks.append(task)
+            self._utilization += task.utilization()
+            self._density += task.density()
+            if task.period != inf:
+                self.hyperperiod = task.period if self.hyperperiod == 0 else _lcm(self.hyperperiod, task.period)
 
     def utilization(self):
-        return sum(task.utilization() for task in self.tasks)
+        return self._utilization
 
     def density(self):
-        return sum(task.density() for task in self.tasks)
-
-    def _update_hyperperiod(self):
-        if len(self.tasks) == 0:
-            self.hyperperiod = 0
-        else:
-            self.hyperperiod = reduce(_lcm, [task.period for task in self.tasks if task.period != inf])
+        return self._density
 
     def __str__(self):
         return f"Task System with {len(self.tasks)} tasks, hyperperiod={self.hyperperiod}" + \
@@ -0,0 +1,145 @@
+from multiprocessing import get_context
+from schedule_sinks import MetricsSink
+from feasibility_horizons import feasibility_horizon
+from shared_corpus import map_corpus
+from task_scheduling import MultiprocessorScheduler, Processor, UniprocessorScheduler
+from task_systems import ReleaseSchedule
+
+"""
+This module evaluates one task system under several scheduler configurations ("variants").
+
+The release schedule of the task system is built once and shared by every variant, either sequentially in this
+process or by forked worker processes that inherit it without pickling.
+"""
+
+
+class SchedulerVariant:
+    """A scheduler configuration to evaluate a task system under"""
+
+    def __init__(self, priority_function, processors, restrict_migration=False, name=None):
+        """
+        :param priority_function: job priority function to use
+        :param processors: a single processor (uniprocessor scheduling) or list of processors
+        :param restrict_migration: whether job migration is restricted (multiprocessor only)
+        :param name: optional name used to identify the variant
+        """
+        self.priority_function = priority_function
+        self.processors = processors
+        self.restrict_migration = restrict_migration
+        self.name = name
+
+    def scheduler(self):
+        """Returns a scheduler for this variant"""
+        if isinstance(self.processors, Processor):
+            return UniprocessorScheduler(self.priority_function, self.processors)
+        return MultiprocessorScheduler(self.priority_function, self.processors, self.restrict_migration)
+
+    def __str__(self):
+        if self.name is None:
+            return "Variant"
+        return f"Variant {self.name}"
+
+
+class VariantResult:
+    """Outcome of simulating a task system under a single variant"""
+
+    def __init__(self, variant, schedulable, metrics):
+        """
+        :param variant: variant that was simulated
+        :param schedulable: whether the task system was schedulable under the variant
+        :param metrics: MetricsSink accumulated over the variant's schedule
+        """
+        self.variant = variant
+        self.schedulable = schedulable
+        self.metrics = metrics
+
+    def __str__(self):
+        return f"{self.variant}: schedulable={self.schedulable}"
+
+
+def _evaluate_variant(task_system, variant, final_time, release_schedule):
+    metrics = MetricsSink()
+    _, schedulable = variant.scheduler().generate_schedule(task_system, final_time=final_time, sink=metrics,
+                                                           release_schedule=release_schedule)
+    return schedulable, metrics
+
+
+def _index_tasks(outcome, task_system):
+    """Key the execution times of an outcome by task index, since tasks are copied when returned from a worker"""
+    schedulable, metrics = outcome
+    task_indices = {task: idx for idx, task in enumerate(task_system.tasks)}
+    metrics.execution_time = {task_indices[task]: time for task, time in metrics.execution_time.items()}
+    return schedulable, metrics
+
+
+def _restore_tasks(outcome, task_system):
+    """Key the execution times of an outcome indexed by _index_tasks by the tasks of :task_system: again"""
+    schedulable, metrics = outcome
+    metrics.execution_time = {task_system.tasks[idx]: time for idx, time in metrics.execution_time.items()}
+    return schedulable, metrics
+
+
+# Inputs shared with forked worker processes, which inherit them instead of unpickling copies
+_shared_inputs = None
+
+
+def _evaluate_shared_variant(variant_idx):
+    task_system, variants, final_time, release_schedule = _shared_inputs
+    return _index_tasks(_evaluate_variant(task_system, variants[variant_idx], final_time, release_schedule),
+                        task_system)
+
+
+def evaluate_variants(task_system, variants, final_time=None, processes=None):
+    """
+    Simulate one task system under several variants, sharing its release schedule between them.
+
+    :param task_system: task system to evaluate
+    :param variants: list of SchedulerVariants to evaluate
+    :param final_time: time to simulate until. Defaults to the longest feasibility horizon of the variants
+    :param processes: number of forked worker processes to evaluate variants in. Defaults to evaluating sequentially
+    :return: list of VariantResults in the same order as :variants:
+    """
+    global _shared_inputs
+
+    if final_time is None:
+        final_time = max(feasibility_horizon(task_system, variant.processors, variant.priority_function).final_time
+                         for variant in variants)
+    release_schedule = ReleaseSchedule(task_system, final_time)
+
+    if processes is None or processes <= 1:
+        outcomes = [_evaluate_variant(task_system, variant, final_time, release_schedule) for variant in variants]
+    else:
+        # priority functions are closures, so variants are inherited by forked workers rather than pickled
+        _shared_inputs = (task_system, variants, final_time, release_schedule)
+        try:
+            with get_context("fork").Pool(processes) as pool:
+                outcomes = [_restore_tasks(outcome, task_system)
+                            for outcome in pool.map(_evaluate_shared_variant, range(len(variants)))]
+        finally:
+            _shared_inputs = None
+
+    return [VariantResult(variant, schedulable, metrics)
+            for variant, (schedulable, metrics) in zip(variants, outcomes)]
+
+
+def evaluate_corpus(task_systems, variants, processes=None):
+    """
+    Simulate many task systems under several variants in worker processes sharing the task systems and their
+    release schedules in shared memory (see shared_corpus).
+
+    :param task_systems: list of task systems to evaluate
+    :param variants: list of SchedulerVariants to evaluate
+    :param processes: number of forked worker processes. Defaults to the number of CPUs
+    :return: list with a list of VariantResults (in the same order as :variants:) per task system
+    """
+    final_times = [max(feasibility_horizon(task_system, variant.processors, variant.priority_function).final_time
+                       for variant in variants) for task_system in task_systems]
+
+    def evaluate(task_system, release_schedule):
+        return [_index_tasks(_evaluate_variant(task_system, variant, release_schedule.final_time, release_schedule),
+                             task_system) for variant in variants]
+
+    outcomes = map_corpus(evaluate, task_systems, final_times, processes)
+    return [[VariantResult(variant, *_restore_tasks(variant_outcome, task_system))
+             for variant, variant_outcome in zip(variants, outcome)]
+            for task_system, outcome in zip(task_systems, outcomes)]